@@ -33,6 +33,9 @@ setup(
         "pywin32;platform_system=='Windows'",
         "openpyxl==3.0.10",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+    },
     entry_points={
         'console_scripts': [
             'analyzemft=analyzeMFT:main',
@@ -0,0 +1,78 @@
+import json
+import os
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple
+from .constants import *
+
+
+# Progress of an analysis as an append-only file of JSON lines: a header line with the key
+# (input and options) followed by one line per checkpoint. Each checkpoint line holds the
+# state at that point and only the hash digests first seen since the previous line, so
+# checkpoints stay cheap however many unique hashes a run collects.
+class CheckpointLog:
+    def __init__(self, path: str, key: Dict[str, Any]) -> None:
+        self.path = path
+        self.key = key
+        self.file: Optional[BinaryIO] = None
+
+    def open(self, position: int = 0) -> None:
+        # A non-zero position continues a log returned by load_checkpoint(), dropping
+        # anything after its last complete line.
+        if position:
+            self.file = open(self.path, 'r+b')
+            self.file.truncate(position)
+            self.file.seek(position)
+            return
+        self.file = open(self.path, 'wb')
+        self.append({'version': CHECKPOINT_VERSION, 'key': self.key})
+
+    def write(self, state: Dict[str, Any], digests: Dict[str, List[str]]) -> None:
+        self.append({'state': state, 'digests': digests})
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        self.file.write(json.dumps(entry).encode('utf-8') + b'\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def remove(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# The last complete checkpoint in a log written for the same key, as (state, every digest
+# logged up to it, length of the log up to it). None for a missing, foreign or empty log.
+def load_checkpoint(path: str, key: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, Set[str]], int]]:
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    state = None
+    digests: Dict[str, Set[str]] = {}
+    position = 0
+    end = 0
+    lines = data.split(b'\n')[:-1]  # the last piece is empty or a line cut short
+    for number, line in enumerate(lines):
+        end += len(line) + 1
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            break
+        if number == 0:
+            if entry.get('version') != CHECKPOINT_VERSION or entry.get('key') != key:
+                return None
+            continue
+        state = entry['state']
+        for name, values in entry['digests'].items():
+            digests.setdefault(name, set()).update(values)
+        position = end
+
+    if state is None:
+        return None
+    return state, digests, position
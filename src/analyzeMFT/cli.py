@@ -1,8 +1,19 @@
 import asyncio
-from optparse import OptionParser, OptionGroup
+from optparse import OptionParser, OptionGroup, OptionValueError
 import sys
-from .mft_analyzer import MftAnalyzer
-from .constants import VERSION
+from .mft_analyzer import MftAnalyzer, parse_record_selection
+from .mft_diff import MftDiff
+from .constants import VERSION, XML_FLUSH_INTERVAL, WRITE_BLOCK_SIZE, SORT_MEMORY_MB, SORTABLE_FORMATS, CHECKPOINT_INTERVAL
+from .file_writers import WRITERS
+from .hashing import parse_hash_algorithms
+from .record_filter import RecordFilter
+from .record_headers import check_record_size
+
+def record_size_option(option, opt_str, value, parser):
+    try:
+        setattr(parser.values, option.dest, check_record_size(value))
+    except ValueError as e:
+        raise OptionValueError(f"option {opt_str}: {e}")
 
 async def main():
     parser = OptionParser(usage="usage: %prog -f <mft_file> -o <output_file> [options]",
@@ -11,12 +22,17 @@ async def main():
                       help="MFT file to analyze", metavar="FILE")
     parser.add_option("-o", "--output", dest="output_file",
                       help="Output file", metavar="FILE")
+    parser.add_option("--diff", nargs=2, dest="diff", metavar="OLD NEW",
+                      help="Write the records created, deleted, modified or renamed between two "
+                           "snapshots of the same MFT to the output file as CSV, instead of analyzing -f")
     
     export_group = OptionGroup(parser, "Export Options")
     export_group.add_option("--csv", action="store_const", const="csv", dest="export_format",
                             help="Export as CSV (default)")
     export_group.add_option("--json", action="store_const", const="json", dest="export_format",
                             help="Export as JSON")
+    export_group.add_option("--jsonl", action="store_const", const="jsonl", dest="export_format",
+                            help="Export as JSON Lines, one record per line (streamed)")
     export_group.add_option("--xml", action="store_const", const="xml", dest="export_format",
                             help="Export as XML")
     export_group.add_option("--excel", action="store_const", const="excel", dest="export_format",
@@ -31,6 +47,15 @@ async def main():
                             help="Export as SQLite database")
     export_group.add_option("--tsk", action="store_const", const="tsk", dest="export_format",
                             help="Export as TSK bodyfile format")
+    export_group.add_option("--flush-interval", type="int", dest="flush_interval", metavar="RECORDS",
+                            help="Flush streamed XML output every RECORDS records (default: 10000)",
+                            default=XML_FLUSH_INTERVAL)
+    export_group.add_option("--sort-timeline", action="store_true", dest="sort_timeline", default=False,
+                            help="Write --timeline and --l2t events in time order instead of record order")
+    export_group.add_option("--sort-memory", type="int", dest="sort_memory", metavar="MB",
+                            help="Memory for sorting before runs are spilled to temporary files "
+                                 "next to the output (default: 256)",
+                            default=SORT_MEMORY_MB)
     
     parser.add_option_group(export_group)
 
@@ -43,10 +68,54 @@ async def main():
 
     parser.add_option("-H", "--hash", action="store_true", dest="compute_hashes",
                       help="Compute hashes (MD5, SHA256, SHA512, CRC32)", default=False)
+    parser.add_option("--hash-algorithms", dest="hash_algorithms", metavar="LIST",
+                      help="Comma-separated hashes to compute, implies -H "
+                           "(md5, sha256, sha512, crc32, blake2b; default: md5,sha256,sha512,crc32). blake2b adds "
+                           "a BLAKE2b column at the end of CSV and Excel output")
+
+    parser.add_option("--record-size", type="int", dest="record_size", action="callback", callback=record_size_option,
+                      help="MFT record size in bytes, a power of two from 256 to 65536 "
+                           "(default: detected from record 0)", metavar="BYTES")
+    parser.add_option("--records", dest="records", metavar="LIST",
+                      help="Only analyze these records, e.g. 1000-2000,5. They are read and parsed directly, "
+                           "with paths resolved from each record's parent chain, instead of parsing the whole MFT")
+    parser.add_option("--filter", action="append", dest="filters", metavar="EXPR",
+                      help="Only output records matching EXPR (repeat to require several): in-use, deleted, dir, "
+                           "file, name=GLOB, ext=EXT[,EXT...] or a $STANDARD_INFORMATION (si) or $FILE_NAME (fn) "
+                           "crtime, mtime, ctime or atime window such as si-mtime>30d or fn-crtime<2024-01-01 (UTC). "
+                           "Checked on the raw record before it is parsed")
+
+    performance_group = OptionGroup(parser, "Performance Options")
+    performance_group.add_option("--reader", type="choice", choices=["mmap", "prefetch", "buffered"], dest="reader",
+                                 help="How to read the MFT: mmap (default), prefetch (background thread reading "
+                                      "large blocks ahead of the parser, for network or spinning storage) or buffered. "
+                                      "Non-seekable input always uses buffered",
+                                 default="mmap")
+    performance_group.add_option("--single-pass", action="store_false", dest="path_index", default=True,
+                                 help="Skip the first pass that indexes parent directories "
+                                      "(faster, but paths of records whose parents were not seen yet are incomplete)")
+    performance_group.add_option("--workers", type="int", dest="workers", metavar="N",
+                                 help="Parse the MFT in N worker processes (default: 1). Writing the output "
+                                      "stays in one process, which limits the speedup", default=1)
+    performance_group.add_option("--block-size", type="int", dest="block_size", metavar="RECORDS",
+                                 help="Records held in memory between writes to the output file (default: 1000)",
+                                 default=WRITE_BLOCK_SIZE)
+    performance_group.add_option("--cache", dest="cache_file", metavar="FILE",
+                                 help="Reuse parsed records from FILE when it was built from the same input "
+                                      "(size and SHA-256) with the same options; otherwise parse as usual and "
+                                      "save the records to FILE for the next export")
+    performance_group.add_option("--resume", action="store_true", dest="resume", default=False,
+                                 help="Continue an interrupted run from its last checkpoint (OUTPUT.checkpoint), "
+                                      "appending to the existing output; starts from the beginning if there is none")
+    performance_group.add_option("--checkpoint-interval", type="int", dest="checkpoint_interval", metavar="RECORDS",
+                                 help="Save progress for --resume every RECORDS input records, 0 to disable "
+                                      "(default: 100000; not available for --excel, --sqlite, --sort-timeline or --cache)",
+                                 default=CHECKPOINT_INTERVAL)
+    parser.add_option_group(performance_group)
 
     (options, args) = parser.parse_args()
 
-    if not options.filename:
+    if not options.filename and not options.diff:
         parser.print_help()
         print("\nError: No input file specified. Use -f or --file to specify an MFT file.")
         sys.exit(1)
@@ -56,12 +125,66 @@ async def main():
         print("\nError: No output file specified. Use -o or --output to specify an output file.")
         sys.exit(1)
 
+    if options.diff:
+        old_file, new_file = options.diff
+        try:
+            MftDiff(old_file, new_file, options.output_file, options.debug, options.verbosity,
+                    record_size=options.record_size).diff()
+            print(f"Diff complete. Changes written to {options.output_file}")
+        except FileNotFoundError as e:
+            print(f"Error: The file '{e.filename}' was not found.")
+            sys.exit(1)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    if options.filters:
+        try:
+            RecordFilter(options.filters)
+        except ValueError as e:
+            parser.error(str(e))
+        if options.cache_file:
+            parser.error("--filter cannot be combined with --cache")
+
+    records = None
+    if options.records:
+        try:
+            records = parse_record_selection(options.records)
+        except ValueError as e:
+            parser.error(str(e))
+        if options.cache_file or options.resume:
+            parser.error("--records cannot be combined with --cache or --resume")
+
+    hash_algorithms = None
+    if options.hash_algorithms:
+        try:
+            hash_algorithms = parse_hash_algorithms(options.hash_algorithms)
+        except ValueError as e:
+            parser.error(str(e))
+
     # Default to CSV if no format specified
     if not options.export_format:
         options.export_format = "csv"  
 
+    if options.sort_timeline and options.export_format not in SORTABLE_FORMATS:
+        parser.error("--sort-timeline only applies to --timeline and --l2t")
+
+    if options.resume:
+        if options.cache_file:
+            parser.error("--resume cannot be combined with --cache")
+        if options.sort_timeline or not hasattr(WRITERS.get(options.export_format), 'resume'):
+            parser.error(f"{options.export_format} output cannot be resumed")
+
     try:
-        analyzer = MftAnalyzer(options.filename, options.output_file, options.debug, options.verbosity, options.compute_hashes, options.export_format)
+        analyzer = MftAnalyzer(options.filename, options.output_file, options.debug, options.verbosity, options.compute_hashes, options.export_format,
+                               reader=options.reader, record_size=options.record_size,
+                               workers=options.workers, hash_algorithms=hash_algorithms,
+                               path_index=options.path_index, flush_interval=options.flush_interval,
+                               block_size=options.block_size, cache_file=options.cache_file,
+                               sort_timeline=options.sort_timeline, sort_memory=options.sort_memory,
+                               resume=options.resume, checkpoint_interval=options.checkpoint_interval,
+                               records=records, filters=options.filters)
         
         await analyzer.analyze()
 
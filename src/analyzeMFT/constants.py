@@ -43,6 +43,9 @@ ATTRIBUTE_NAMES = {
     LOGGED_UTILITY_STREAM_ATTRIBUTE: "$LOGGED_UTILITY_STREAM"
 }
 
+# Attributes decoded for outputs that only use names, sizes and timestamps
+TIMESTAMP_ATTRIBUTES = frozenset({STANDARD_INFORMATION_ATTRIBUTE, FILE_NAME_ATTRIBUTE})
+
 # Standard Information Attribute
 STANDARD_INFORMATION = {
     0x00: "Creation time",
@@ -208,13 +211,90 @@ FILENAME_NAMESPACE = {
     2: "DOS",
     3: "Win32 & DOS"
 }
+DOS_NAMESPACE = 2
 
 # Index Entry Flags
 INDEX_ENTRY_NODE = 0x01
 INDEX_ENTRY_END = 0x02
 
-# MFT Record Size
+# MFT Record Size (default when it cannot be detected from record 0)
 MFT_RECORD_SIZE = 1024
+MIN_MFT_RECORD_SIZE = 256
+MAX_MFT_RECORD_SIZE = 65536
+
+# Reader block sizes (rounded down to a whole number of records)
+READ_BLOCK_SIZE = 1024 * 1024
+PREFETCH_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Records handed to a worker process at a time in --workers mode
+PARALLEL_CHUNK_RECORDS = 8192
+
+# Record hash algorithms, in CSV column order
+HASH_ALGORITHMS = ['md5', 'sha256', 'sha512', 'crc32', 'blake2b']
+DEFAULT_HASH_ALGORITHMS = ['md5', 'sha256', 'sha512', 'crc32']
+# Hashes with a fixed CSV column (empty unless computed); any other selected hash gets a
+# column appended after CSV_HEADER
+CSV_HASH_ALGORITHMS = ['md5', 'sha256', 'sha512', 'crc32']
+HASH_LABELS = {
+    'md5': 'MD5',
+    'sha256': 'SHA256',
+    'sha512': 'SHA512',
+    'crc32': 'CRC32',
+    'blake2b': 'BLAKE2b'
+}
+
+# Raw records per batch handed to a hashing worker
+HASH_BATCH_SIZE = 256
+
+# Directory paths kept by the path resolver, keyed by (record number, sequence)
+PATH_CACHE_SIZE = 65536
+
+# Parsed records kept by MftAnalyzer.get_record(), keyed by record number
+PARSED_RECORD_CACHE_SIZE = 4096
+
+# Smallest timestamp batch worth handing to numpy when it is installed
+TIMESTAMP_NUMPY_MIN_BATCH = 64
+
+# Records parsed between writes to the output file
+WRITE_BLOCK_SIZE = 1000
+
+# Records written to a streamed XML file between flushes
+XML_FLUSH_INTERVAL = 10000
+
+# Rows per SQLite transaction and page cache size (KiB) used while bulk loading
+SQLITE_TRANSACTION_SIZE = 500000
+SQLITE_CACHE_KIB = 262144
+
+# Formatted date/time pairs kept by the log2timeline writer, keyed by second
+L2T_TIME_CACHE_SIZE = 65536
+
+# Sorted timelines (--sort-timeline): default memory budget in MiB, estimated bytes held per
+# event besides its path, and events per chunk in a spilled run
+SORT_MEMORY_MB = 256
+SORT_EVENT_BYTES = 120
+SORT_RUN_CHUNK_SIZE = 10000
+SORTABLE_FORMATS = ('timeline', 'l2t')
+
+# Rows per worksheet in .xlsx output (Excel's limit, header row included)
+EXCEL_MAX_ROWS = 1048576
+
+# Parsed-record cache file (--cache)
+RECORD_CACHE_MAGIC = b'AMFTRCC1'
+RECORD_CACHE_VERSION = 2
+# Input totals kept in the cache footer, since the cached blocks only hold the records written out
+RECORD_CACHE_STATS = ('total_records', 'active_records', 'directories', 'files')
+
+# Progress log for --resume, written next to the output every CHECKPOINT_INTERVAL input records
+CHECKPOINT_SUFFIX = '.checkpoint'
+CHECKPOINT_VERSION = 1
+CHECKPOINT_INTERVAL = 100000
+
+# Change set written by --diff
+DIFF_HEADER = [
+    'Change', 'Record Number', 'Old Sequence Number', 'New Sequence Number',
+    'Old LSN', 'New LSN', 'Old Filepath', 'New Filepath',
+    'Old File Size', 'New File Size', 'Old SI Modification Time', 'New SI Modification Time',
+]
 
 # Attribute Flags
 ATTR_FLAG_COMPRESSED = 0x0001
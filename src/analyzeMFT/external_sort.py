@@ -0,0 +1,60 @@
+import heapq
+import marshal
+import tempfile
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional
+from .constants import *
+
+
+def iter_run(run: BinaryIO) -> Iterator[Any]:
+    run.seek(0)
+    while True:
+        try:
+            chunk = marshal.load(run)
+        except EOFError:
+            return
+        yield from chunk
+
+
+# Sorts more items than fit in memory. Items are collected until their estimated size
+# reaches memory_budget, then sorted and spilled to a temporary file as one run;
+# merged() k-way merges every run with what is still in memory. Items must be
+# marshal-able and comparable (plain tuples of ints and strings).
+class ExternalSorter:
+    def __init__(self, memory_budget: int, temp_dir: Optional[str] = None,
+                 chunk_size: int = SORT_RUN_CHUNK_SIZE) -> None:
+        self.memory_budget = memory_budget
+        self.temp_dir = temp_dir
+        self.chunk_size = chunk_size
+        self.items: List[Any] = []
+        self.used = 0
+        self.runs: List[BinaryIO] = []
+
+    def extend(self, items: Iterable[Any], size: int) -> None:
+        self.items.extend(items)
+        self.used += size
+        if self.used >= self.memory_budget:
+            self.spill()
+
+    def spill(self) -> None:
+        if not self.items:
+            return
+        self.items.sort()
+        run = tempfile.TemporaryFile(dir=self.temp_dir, prefix='analyzemft-sort-')
+        for start in range(0, len(self.items), self.chunk_size):
+            marshal.dump(self.items[start:start + self.chunk_size], run)
+        self.runs.append(run)
+        self.items = []
+        self.used = 0
+
+    def merged(self) -> Iterator[Any]:
+        self.items.sort()
+        if not self.runs:
+            return iter(self.items)
+        return heapq.merge(*(iter_run(run) for run in self.runs), self.items)
+
+    def close(self) -> None:
+        for run in self.runs:
+            run.close()
+        self.runs = []
+        self.items = []
+        self.used = 0
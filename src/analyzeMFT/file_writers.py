@@ -2,99 +2,192 @@ import asyncio
 import csv
 import os
 import json
+from itertools import islice
 import sqlite3
-import xml.etree.ElementTree as ET
-from typing import List, Dict, Any
+from xml.sax.saxutils import escape
+from datetime import timedelta
+from typing import List, Dict, Any, Iterable, Optional, Sequence, TextIO, Tuple
 from .mft_record import MftRecord
+from .windows_time import FILETIME_EPOCH, MAX_FILETIME, filetime_to_unixtime
+from .lru_cache import LRUCache
+from .external_sort import ExternalSorter
 from .constants import *
 
-class FileWriters:
-    @staticmethod
-    async def write_csv(records: List[MftRecord], output_file: str) -> None:
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(CSV_HEADER) 
-            for record in records:
-                writer.writerow(record.to_csv())
-            await asyncio.sleep(0)  
 
-    @staticmethod
-    async def write_json(records: List[MftRecord], output_file: str) -> None:
-        json_data = [record.__dict__ for record in records]
-        with open(output_file, 'w', encoding='utf-8') as jsonfile:
-            json.dump(json_data, jsonfile, indent=2, default=str)
-        await asyncio.sleep(0)
+def json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return str(value)
 
-    @staticmethod
-    async def write_xml(records: List[MftRecord], output_file: str) -> None:
-        root = ET.Element("mft_records")
-        for record in records:
-            record_elem = ET.SubElement(root, "record")
-            for key, value in record.__dict__.items():
-                ET.SubElement(record_elem, key).text = str(value)
-        tree = ET.ElementTree(root)
-        tree.write(output_file, encoding='utf-8', xml_declaration=True)
-        await asyncio.sleep(0)
 
-    @staticmethod
-    async def write_excel(records: List[MftRecord], output_file: str) -> None:
-        try:
-            import openpyxl
-        except ImportError:
-            print("openpyxl is not installed. Please install it to use Excel export.")
-            return
+# Output files that can be cut back to a checkpoint and continued. checkpoint() syncs the file
+# and returns its length (plus any writer state); resume() truncates the file to that length
+# and reopens it for appending, so records written after the checkpoint are not duplicated.
+class ResumableFile:
+    def checkpoint(self) -> Dict[str, Any]:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {'position': self.file.tell()}
 
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.append(CSV_HEADER) 
+    def reopen(self, state: Dict[str, Any], **kwargs) -> None:
+        with open(self.output_file, 'r+b') as f:
+            f.truncate(state['position'])
+        self.file = open(self.output_file, 'a', **kwargs)
+
+# Selected hashes that CSV_HEADER has no column for, in the order their columns are appended.
+def extra_hash_columns(hash_algorithms: Sequence[str]) -> List[str]:
+    return [name for name in hash_algorithms if name not in CSV_HASH_ALGORITHMS]
+
+def csv_header(extra_hashes: Sequence[str]) -> List[str]:
+    return CSV_HEADER + [HASH_LABELS[name] for name in extra_hashes]
+
+# CSV_HEADER (plus a column per extra hash) followed by one row per record.
+class CsvWriter(ResumableFile):
+    def __init__(self, output_file: str, hash_algorithms: Sequence[str] = ()) -> None:
+        self.output_file = output_file
+        self.extra_hashes = extra_hash_columns(hash_algorithms)
+        self.file: Optional[TextIO] = None
+        self.writer = None
+
+    def open(self) -> None:
+        self.file = open(self.output_file, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(csv_header(self.extra_hashes))
+
+    def resume(self, state: Dict[str, Any]) -> None:
+        self.reopen(state, newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+
+    def write_block(self, records: List[MftRecord]) -> None:
+        extra_hashes = self.extra_hashes
+        self.writer.writerows([str(item) for item in record.to_csv(extra_hashes)] for record in records)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+# A single JSON array laid out exactly as json.dump(..., indent=2) would write it, but
+# encoded one record at a time so the list never has to exist in memory.
+class JsonWriter(ResumableFile):
+    def __init__(self, output_file: str) -> None:
+        self.output_file = output_file
+        self.file: Optional[TextIO] = None
+        self.encoder = json.JSONEncoder(indent=2, default=json_default)
+        self.written = 0
+
+    def open(self) -> None:
+        self.file = open(self.output_file, 'w', encoding='utf-8')
+        self.file.write('[')
+
+    def checkpoint(self) -> Dict[str, Any]:
+        return dict(super().checkpoint(), written=self.written)
+
+    def resume(self, state: Dict[str, Any]) -> None:
+        self.reopen(state, encoding='utf-8')
+        self.written = state['written']
+
+    def write_block(self, records: List[MftRecord]) -> None:
+        parts = []
         for record in records:
-            ws.append(record.to_csv())
-        wb.save(output_file)
-        await asyncio.sleep(0)
+            parts.append(',\n  ' if self.written else '\n  ')
+            parts.append(self.encoder.encode(record.to_dict()).replace('\n', '\n  '))
+            self.written += 1
+        self.file.write(''.join(parts))
 
-    @staticmethod
-    async def write_body(records: List[MftRecord], output_file: str) -> None:
-        with open(output_file, 'w', encoding='utf-8') as bodyfile:
-            for record in records:
-                # Format: MD5|name|inode|mode_as_string|UID|GID|size|atime|mtime|ctime|crtime
-                bodyfile.write(f"0|{record.filename}|{record.recordnum}|{record.flags:04o}|0|0|"
-                               f"{record.filesize}|{record.fn_times['atime'].unixtime}|"
-                               f"{record.fn_times['mtime'].unixtime}|{record.fn_times['ctime'].unixtime}|"
-                               f"{record.fn_times['crtime'].unixtime}\n")
-            await asyncio.sleep(0)
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.write('\n]' if self.written else ']')
+            self.file.close()
+            self.file = None
 
-    @staticmethod
-    async def write_timeline(records: List[MftRecord], output_file: str) -> None:
-        with open(output_file, 'w', encoding='utf-8') as timeline:
-            for record in records:
-                # Format: Time|Source|Type|User|Host|Short|Desc|Version|Filename|Inode|Notes|Format|Extra
-                timeline.write(f"{record.fn_times['crtime'].unixtime}|MFT|CREATE|||||{record.filename}|{record.recordnum}||||\n")
-                timeline.write(f"{record.fn_times['mtime'].unixtime}|MFT|MODIFY|||||{record.filename}|{record.recordnum}||||\n")
-                timeline.write(f"{record.fn_times['atime'].unixtime}|MFT|ACCESS|||||{record.filename}|{record.recordnum}||||\n")
-                timeline.write(f"{record.fn_times['ctime'].unixtime}|MFT|CHANGE|||||{record.filename}|{record.recordnum}||||\n")
-            await asyncio.sleep(0)
+# One compact JSON object per line, written block by block as records are parsed.
+class JsonLinesWriter(ResumableFile):
+    def __init__(self, output_file: str) -> None:
+        self.output_file = output_file
+        self.file: Optional[TextIO] = None
+        self.encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=json_default)
 
-    @staticmethod
-    async def write_l2t(records: List[MftRecord], output_file: str) -> None:
-        with open(output_file, 'w', newline='', encoding='utf-8') as l2tfile:
-            writer = csv.writer(l2tfile)
-            writer.writerow(['date', 'time', 'timezone', 'MACB', 'source', 'sourcetype', 'type', 'user', 'host', 'short', 'desc', 'version', 'filename', 'inode', 'notes', 'format', 'extra'])
-            for record in records:
-                for time_type, time_obj in record.fn_times.items():
-                    macb = 'M' if time_type == 'mtime' else 'A' if time_type == 'atime' else 'C' if time_type == 'ctime' else 'B'
-                    date_str = time_obj.dt.strftime('%m/%d/%Y') if time_obj.dt else ''
-                    time_str = time_obj.dt.strftime('%H:%M:%S') if time_obj.dt else ''
-                    writer.writerow([
-                        date_str, time_str, 'UTC', macb, 'MFT', 'FILESYSTEM', time_type, '', '', '',
-                        f"{record.filename} {time_type}", '', record.filename, record.recordnum, '', '', ''
-                    ])
-            await asyncio.sleep(0)
+    def open(self) -> None:
+        self.file = open(self.output_file, 'w', encoding='utf-8', newline='\n')
 
+    def resume(self, state: Dict[str, Any]) -> None:
+        self.reopen(state, encoding='utf-8', newline='\n')
 
-    @staticmethod
-    async def write_sqlite(records: List[MftRecord], output_file: str) -> None:
-        conn = sqlite3.connect(output_file)
-        cursor = conn.cursor()
+    def write_block(self, records: List[MftRecord]) -> None:
+        encode = self.encoder.encode
+        self.file.write(''.join(encode(record.to_dict()) + '\n' for record in records))
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+# Streams <record> elements as blocks arrive; the layout matches what ElementTree wrote for the
+# whole tree. The file is flushed every flush_interval records.
+class XmlWriter(ResumableFile):
+    def __init__(self, output_file: str, flush_interval: int = XML_FLUSH_INTERVAL) -> None:
+        self.output_file = output_file
+        self.flush_interval = max(int(flush_interval), 1)
+        self.file: Optional[TextIO] = None
+        self.unflushed = 0
+
+    def open(self) -> None:
+        self.file = open(self.output_file, 'w', encoding='utf-8', newline='\n')
+        self.file.write("<?xml version='1.0' encoding='utf-8'?>\n<mft_records>")
+
+    def resume(self, state: Dict[str, Any]) -> None:
+        self.reopen(state, encoding='utf-8', newline='\n')
+
+    def write_block(self, records: List[MftRecord]) -> None:
+        write = self.file.write
+        for record in records:
+            parts = ['<record>']
+            for key, value in record.to_dict().items():
+                text = escape(str(value))
+                parts.append(f'<{key}>{text}</{key}>' if text else f'<{key} />')
+            parts.append('</record>')
+            write(''.join(parts))
+            self.unflushed += 1
+            if self.unflushed >= self.flush_interval:
+                self.file.flush()
+                self.unflushed = 0
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.write('</mft_records>')
+            self.file.close()
+            self.file = None
+
+# Bulk-loads records into SQLite: journaling and syncing are off while loading, rows go in with
+# executemany inside large transactions, and secondary indexes are built once at the end.
+# Rows are keyed on a generated row id, so repeated record numbers (zeroed or reused records)
+# each get a row, as they do in the other output formats.
+class SqliteWriter:
+    ATTRIBUTES = TIMESTAMP_ATTRIBUTES
+    INSERT = '''
+        INSERT INTO mft_records (
+            record_number, filename, filepath, parent_record_number, file_size,
+            is_directory, creation_time, modification_time, access_time,
+            entry_time, attribute_types
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    def __init__(self, output_file: str, transaction_size: int = SQLITE_TRANSACTION_SIZE) -> None:
+        self.output_file = output_file
+        self.transaction_size = transaction_size
+        self.conn: Optional[sqlite3.Connection] = None
+        self.pending_rows = 0
+
+    def open(self) -> None:
+        if os.path.exists(self.output_file):
+            os.remove(self.output_file)
+        self.conn = sqlite3.connect(self.output_file, isolation_level=None)
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA journal_mode = OFF")
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_KIB}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
 
         # Create and populate static tables
         sql_dir = os.path.join(os.path.dirname(__file__), 'sql')
@@ -102,11 +195,13 @@ class FileWriters:
             with open(os.path.join(sql_dir, sql_file), 'r') as f:
                 cursor.executescript(f.read())
 
-        # Create MFT records table
+        cursor.execute("BEGIN")
         cursor.execute('''
             CREATE TABLE mft_records (
-                record_number INTEGER PRIMARY KEY,
+                id INTEGER PRIMARY KEY,
+                record_number INTEGER,
                 filename TEXT,
+                filepath TEXT,
                 parent_record_number INTEGER,
                 file_size INTEGER,
                 is_directory INTEGER,
@@ -118,39 +213,327 @@ class FileWriters:
             )
         ''')
 
-        # Insert MFT records
+    def write_block(self, records: List[MftRecord]) -> None:
+        self.conn.executemany(self.INSERT, [(
+            record.recordnum,
+            record.filename,
+            record.filepath,
+            record.get_parent_record_num(),
+            record.filesize,
+            1 if record.flags & FILE_RECORD_IS_DIRECTORY else 0,
+            record.fn_times['crtime'].dtstr,
+            record.fn_times['mtime'].dtstr,
+            record.fn_times['atime'].dtstr,
+            record.fn_times['ctime'].dtstr,
+            ','.join(map(str, record.attribute_types))
+        ) for record in records])
+        self.pending_rows += len(records)
+        if self.pending_rows >= self.transaction_size:
+            self.conn.execute("COMMIT")
+            self.conn.execute("BEGIN")
+            self.pending_rows = 0
+
+    def close(self) -> None:
+        if self.conn is None:
+            return
+        cursor = self.conn.cursor()
+        cursor.execute("CREATE INDEX idx_mft_records_number ON mft_records (record_number)")
+        cursor.execute("CREATE INDEX idx_mft_records_parent ON mft_records (parent_record_number)")
+        cursor.execute("CREATE INDEX idx_mft_records_filename ON mft_records (filename)")
+        cursor.execute("COMMIT")
+        cursor.execute("PRAGMA journal_mode = DELETE")
+        self.conn.close()
+        self.conn = None
+
+EXCEL_TEXT_COLUMNS = tuple(CSV_HEADER.index(name) for name in ('Filename', 'Filepath', 'Volume Name'))
+
+
+# Write-only openpyxl workbook, so rows are streamed to disk instead of held as cells. A new
+# sheet (with its own header row) is started whenever the current one reaches max_rows.
+class ExcelWriter:
+    def __init__(self, output_file: str, max_rows: int = EXCEL_MAX_ROWS, hash_algorithms: Sequence[str] = ()) -> None:
+        self.output_file = output_file
+        self.max_rows = max_rows
+        self.extra_hashes = extra_hash_columns(hash_algorithms)
+        self.workbook = None
+        self.sheet = None
+        self.sheet_rows = 0
+
+    def open(self) -> None:
+        try:
+            import openpyxl
+        except ImportError:
+            print("openpyxl is not installed. Please install it to use Excel export.")
+            return
+
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.add_sheet()
+
+    def add_sheet(self) -> None:
+        number = len(self.workbook.worksheets) + 1
+        self.sheet = self.workbook.create_sheet("MFT Records" if number == 1 else f"MFT Records {number}")
+        self.sheet.append(csv_header(self.extra_hashes))
+        self.sheet_rows = 1
+
+    def write_block(self, records: List[MftRecord]) -> None:
+        if self.workbook is None:
+            return
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
         for record in records:
-            cursor.execute('''
-                INSERT INTO mft_records (
-                    record_number, filename, parent_record_number, file_size,
-                    is_directory, creation_time, modification_time, access_time,
-                    entry_time, attribute_types
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                record.recordnum,
-                record.filename,
-                record.get_parent_record_num(),
-                record.filesize,
-                1 if record.flags & FILE_RECORD_IS_DIRECTORY else 0,
-                record.fn_times['crtime'].dtstr,
-                record.fn_times['mtime'].dtstr,
-                record.fn_times['atime'].dtstr,
-                record.fn_times['ctime'].dtstr,
-                ','.join(map(str, record.attribute_types))
-            ))
-
-        conn.commit()
-        conn.close()
+            if self.sheet_rows >= self.max_rows:
+                self.add_sheet()
+            row = record.to_csv(self.extra_hashes)
+            # Names come straight from disk and may hold control characters openpyxl rejects;
+            # a rejected cell would also break the write-only sheet for every later row.
+            for column in EXCEL_TEXT_COLUMNS:
+                if row[column]:
+                    row[column] = ILLEGAL_CHARACTERS_RE.sub('', row[column])
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+    def close(self) -> None:
+        if self.workbook is not None:
+            self.workbook.save(self.output_file)
+            self.workbook = None
+
+def record_path(record: MftRecord) -> str:
+    return record.filepath or record.filename
+
+# Bodyfile lines for mactime and TSK: MD5|name|inode|mode_as_string|UID|GID|size|atime|mtime|ctime|crtime
+class BodyFileWriter(ResumableFile):
+    ATTRIBUTES = TIMESTAMP_ATTRIBUTES
+    NEEDS_DTSTR = False
+
+    def __init__(self, output_file: str) -> None:
+        self.output_file = output_file
+        self.file: Optional[TextIO] = None
+
+    def open(self) -> None:
+        self.file = open(self.output_file, 'w', encoding='utf-8')
+
+    def resume(self, state: Dict[str, Any]) -> None:
+        self.reopen(state, encoding='utf-8')
+
+    def write_block(self, records: List[MftRecord]) -> None:
+        self.file.write(''.join(
+            f"0|{record_path(record)}|{record.recordnum}|{record.flags:04o}|0|0|"
+            f"{record.filesize}|{record.fn_times['atime'].unixtime}|"
+            f"{record.fn_times['mtime'].unixtime}|{record.fn_times['ctime'].unixtime}|"
+            f"{record.fn_times['crtime'].unixtime}\n"
+            for record in records))
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+# Timeline writers work on events: (filetime, record number, event index, path) tuples, one per
+# $FILE_NAME timestamp. write_block() writes a block's events in record order; the same events
+# can instead be collected by SortedTimelineWriter and written in time order.
+def block_events(records: List[MftRecord], time_keys: Tuple[str, ...]) -> List[Tuple[int, int, int, str]]:
+    events = []
+    for record in records:
+        path = record_path(record)
+        times = record.fn_times
+        recordnum = record.recordnum
+        for kind, key in enumerate(time_keys):
+            events.append((times[key].filetime, recordnum, kind, path))
+    return events
+
+# Four TSK timeline lines per record, one for each $FILE_NAME timestamp.
+# Format: Time|Source|Type|User|Host|Short|Desc|Version|Filename|Inode|Notes|Format|Extra
+class TimelineWriter(ResumableFile):
+    ATTRIBUTES = TIMESTAMP_ATTRIBUTES
+    NEEDS_DTSTR = False
+    EVENTS = (('crtime', 'CREATE'), ('mtime', 'MODIFY'), ('atime', 'ACCESS'), ('ctime', 'CHANGE'))
+    TIME_KEYS = tuple(key for key, _ in EVENTS)
+
+    def __init__(self, output_file: str) -> None:
+        self.output_file = output_file
+        self.file: Optional[TextIO] = None
+
+    def open(self) -> None:
+        self.file = open(self.output_file, 'w', encoding='utf-8')
+
+    def resume(self, state: Dict[str, Any]) -> None:
+        self.reopen(state, encoding='utf-8')
+
+    def block_events(self, records: List[MftRecord]) -> List[Tuple[int, int, int, str]]:
+        return block_events(records, self.TIME_KEYS)
+
+    def write_block(self, records: List[MftRecord]) -> None:
+        self.write_events(self.block_events(records))
+
+    def write_events(self, events: Iterable[Tuple[int, int, int, str]]) -> None:
+        names = [event for _, event in self.EVENTS]
+        self.file.write(''.join(
+            f"{filetime_to_unixtime(filetime)}|MFT|{names[kind]}|||||{path}|{recordnum}||||\n"
+            for filetime, recordnum, kind, path in events))
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+# log2timeline CSV, one row per $FILE_NAME timestamp in on-disk order. Date and time
+# text is formatted once per second and reused, since neighbouring records share seconds.
+class L2tWriter(ResumableFile):
+    ATTRIBUTES = TIMESTAMP_ATTRIBUTES
+    NEEDS_DTSTR = False
+    HEADER = ['date', 'time', 'timezone', 'MACB', 'source', 'sourcetype', 'type', 'user', 'host', 'short', 'desc', 'version', 'filename', 'inode', 'notes', 'format', 'extra']
+    TIME_ORDER = (('crtime', 'B'), ('mtime', 'M'), ('ctime', 'C'), ('atime', 'A'))
+    TIME_KEYS = tuple(key for key, _ in TIME_ORDER)
+
+    def __init__(self, output_file: str) -> None:
+        self.output_file = output_file
+        self.file: Optional[TextIO] = None
+        self.writer = None
+        self.time_text = LRUCache(L2T_TIME_CACHE_SIZE)
+
+    def open(self) -> None:
+        self.file = open(self.output_file, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.HEADER)
+
+    def resume(self, state: Dict[str, Any]) -> None:
+        self.reopen(state, newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+
+    def format_time(self, filetime: int) -> Tuple[str, str]:
+        if not 0 < filetime <= MAX_FILETIME:
+            return '', ''
+        second = filetime // 10000000
+        text = self.time_text.get(second)
+        if text is None:
+            dt = FILETIME_EPOCH + timedelta(seconds=second)
+            text = (dt.strftime('%m/%d/%Y'), dt.strftime('%H:%M:%S'))
+            self.time_text.put(second, text)
+        return text
+
+    def block_events(self, records: List[MftRecord]) -> List[Tuple[int, int, int, str]]:
+        return block_events(records, self.TIME_KEYS)
+
+    def write_block(self, records: List[MftRecord]) -> None:
+        self.write_events(self.block_events(records))
+
+    def write_events(self, events: Iterable[Tuple[int, int, int, str]]) -> None:
+        rows = []
+        for filetime, recordnum, kind, path in events:
+            time_type, macb = self.TIME_ORDER[kind]
+            date_str, time_str = self.format_time(filetime)
+            rows.append([
+                date_str, time_str, 'UTC', macb, 'MFT', 'FILESYSTEM', time_type, '', '', '',
+                f"{path} {time_type}", '', path, recordnum, '', '', ''
+            ])
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+# Wraps a timeline writer so its output comes out in time order. Events are handed to an
+# ExternalSorter as blocks arrive and only written, merged, when the writer is closed.
+class SortedTimelineWriter:
+    def __init__(self, writer: Any, memory_budget: int = SORT_MEMORY_MB * 1024 * 1024,
+                 temp_dir: Optional[str] = None) -> None:
+        self.writer = writer
+        self.sorter = ExternalSorter(memory_budget, temp_dir)
+
+    def open(self) -> None:
+        self.writer.open()
+
+    def write_block(self, records: List[MftRecord]) -> None:
+        events = self.writer.block_events(records)
+        size = len(events) * SORT_EVENT_BYTES + sum(len(record_path(record)) for record in records)
+        self.sorter.extend(events, size)
+
+    def close(self) -> None:
+        if self.writer.file is None:
+            return
+        try:
+            events = self.sorter.merged()
+            while True:
+                chunk = list(islice(events, SORT_RUN_CHUNK_SIZE))
+                if not chunk:
+                    break
+                self.writer.write_events(chunk)
+        finally:
+            self.sorter.close()
+            self.writer.close()
+
+# Writer class for each export format. Every writer takes the output path and has
+# open(), write_block(records) and close(); the analyzer calls write_block as blocks are parsed.
+# Writers with checkpoint() and resume() can continue an interrupted run (--resume).
+# Writers that set ATTRIBUTES only read what those attribute types decode; the others need
+# every attribute. Writers with NEEDS_DTSTR = False format times themselves from the raw
+# FILETIMEs, so blocks written to them skip building the ISO strings.
+WRITERS = {
+    'csv': CsvWriter,
+    'json': JsonWriter,
+    'jsonl': JsonLinesWriter,
+    'xml': XmlWriter,
+    'excel': ExcelWriter,
+    'sqlite': SqliteWriter,
+    'body': BodyFileWriter,
+    'timeline': TimelineWriter,
+    'l2t': L2tWriter,
+    'tsk': BodyFileWriter,
+}
+
+
+def write_records(writer: Any, records: List[MftRecord]) -> None:
+    writer.open()
+    try:
+        writer.write_block(records)
+    finally:
+        writer.close()
+
+
+# Whole-list helpers kept for callers that already hold every record.
+class FileWriters:
+    @staticmethod
+    async def write_csv(records: List[MftRecord], output_file: str) -> None:
+        write_records(CsvWriter(output_file), records)
+        await asyncio.sleep(0)
+
+    @staticmethod
+    async def write_json(records: List[MftRecord], output_file: str) -> None:
+        write_records(JsonWriter(output_file), records)
+        await asyncio.sleep(0)
+
+    @staticmethod
+    async def write_xml(records: List[MftRecord], output_file: str) -> None:
+        write_records(XmlWriter(output_file), records)
+        await asyncio.sleep(0)
+
+    @staticmethod
+    async def write_excel(records: List[MftRecord], output_file: str) -> None:
+        write_records(ExcelWriter(output_file), records)
+        await asyncio.sleep(0)
+
+    @staticmethod
+    async def write_body(records: List[MftRecord], output_file: str) -> None:
+        write_records(BodyFileWriter(output_file), records)
+        await asyncio.sleep(0)
+
+    @staticmethod
+    async def write_timeline(records: List[MftRecord], output_file: str) -> None:
+        write_records(TimelineWriter(output_file), records)
+        await asyncio.sleep(0)
+
+    @staticmethod
+    async def write_l2t(records: List[MftRecord], output_file: str) -> None:
+        write_records(L2tWriter(output_file), records)
+        await asyncio.sleep(0)
+
+    @staticmethod
+    async def write_sqlite(records: List[MftRecord], output_file: str) -> None:
+        write_records(SqliteWriter(output_file), records)
         await asyncio.sleep(0)
 
     @staticmethod
     async def write_tsk(records: List[MftRecord], output_file: str) -> None:
-        with open(output_file, 'w', newline='', encoding='utf-8') as tskfile:
-            for record in records:
-                # TSK body file format:
-                # MD5|name|inode|mode_as_string|UID|GID|size|atime|mtime|ctime|crtime
-                tskfile.write(f"0|{record.filename}|{record.recordnum}|{record.flags:04o}|0|0|"
-                              f"{record.filesize}|{record.fn_times['atime'].unixtime}|"
-                              f"{record.fn_times['mtime'].unixtime}|{record.fn_times['ctime'].unixtime}|"
-                              f"{record.fn_times['crtime'].unixtime}\n")
-            await asyncio.sleep(0)
\ No newline at end of file
+        write_records(BodyFileWriter(output_file), records)
+        await asyncio.sleep(0)
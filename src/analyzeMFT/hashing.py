@@ -0,0 +1,83 @@
+import asyncio
+import hashlib
+import zlib
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from .constants import *
+
+
+def _crc32(data: bytes) -> str:
+    return format(zlib.crc32(data) & 0xFFFFFFFF, '08x')
+
+HASHERS: Dict[str, Callable[[bytes], str]] = {
+    'md5': lambda data: hashlib.md5(data).hexdigest(),
+    'sha256': lambda data: hashlib.sha256(data).hexdigest(),
+    'sha512': lambda data: hashlib.sha512(data).hexdigest(),
+    'crc32': _crc32,
+    'blake2b': lambda data: hashlib.blake2b(data).hexdigest(),
+}
+
+
+def parse_hash_algorithms(spec: str) -> List[str]:
+    algorithms = [name.strip().lower() for name in spec.split(',') if name.strip()]
+    unknown = [name for name in algorithms if name not in HASHERS]
+    if unknown:
+        raise ValueError(f"Unsupported hash algorithm(s): {', '.join(unknown)}. "
+                         f"Choose from: {', '.join(HASH_ALGORITHMS)}")
+    return [name for name in HASH_ALGORITHMS if name in algorithms]
+
+def hash_record(raw_record: Union[bytes, memoryview], algorithms: Sequence[str] = DEFAULT_HASH_ALGORITHMS) -> Dict[str, str]:
+    return {name: HASHERS[name](raw_record) for name in algorithms}
+
+def hash_records(batch: Union[bytes, bytearray], record_size: int, algorithms: Sequence[str]) -> List[Dict[str, str]]:
+    view = memoryview(batch)
+    return [hash_record(view[offset:offset + record_size], algorithms)
+            for offset in range(0, len(view), record_size)]
+
+
+# Hashes raw records in an executor, off the parsing path. Full batches are submitted
+# while parsing continues; drain() waits for them and stores the digests on the records.
+class RecordHasher:
+    def __init__(self, executor: Executor, algorithms: Sequence[str], record_size: int,
+                 batch_size: int = HASH_BATCH_SIZE) -> None:
+        self.executor = executor
+        self.algorithms = list(algorithms)
+        self.record_size = record_size
+        self.batch_size = batch_size
+        self.batch = bytearray()
+        self.batch_records = []
+        self.pending: List[Tuple[list, asyncio.Future]] = []
+
+    def add(self, record, raw_record: Union[bytes, memoryview]) -> None:
+        if len(raw_record) != self.record_size:
+            # A short trailing record cannot share a fixed-stride batch; hash it on its own.
+            self.submit()
+            self.batch_records.append(record)
+            self.batch += raw_record
+            self.submit(len(raw_record))
+            return
+
+        self.batch_records.append(record)
+        self.batch += raw_record
+        if len(self.batch_records) >= self.batch_size:
+            self.submit()
+
+    def submit(self, record_size: Optional[int] = None) -> None:
+        if not self.batch_records:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, hash_records, self.batch,
+                                      record_size or self.record_size, self.algorithms)
+        self.pending.append((self.batch_records, future))
+        self.batch = bytearray()
+        self.batch_records = []
+
+    async def drain(self) -> List[Tuple[object, Dict[str, str]]]:
+        self.submit()
+        hashed = []
+        pending, self.pending = self.pending, []
+        for records, future in pending:
+            for record, hashes in zip(records, await future):
+                record.apply_hashes(hashes)
+                hashed.append((record, hashes))
+        return hashed
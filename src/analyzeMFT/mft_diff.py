@@ -0,0 +1,174 @@
+import csv
+import mmap
+import time
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+from .constants import *
+from .mft_record import MftRecord
+from .record_headers import check_record_size, decode_headers, record_size_from_header
+from .parent_index import LazyPaths
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FILE_MAGIC = int.from_bytes(MFT_RECORD_MAGIC, BYTE_ORDER)
+
+
+# In-use base records (not extension records) of one snapshot, padded with False up to count
+# for the records past the end of a shorter file.
+def live_mask(columns: Dict[str, List[int]], count: int):
+    magic, flags, base_ref = columns['magic'], columns['flags'], columns['base_ref']
+    if np is not None and isinstance(flags, np.ndarray):
+        live = np.zeros(count, dtype=bool)
+        live[:len(flags)] = (magic == FILE_MAGIC) & (flags & FILE_RECORD_IN_USE != 0) & (base_ref == 0)
+        return live
+    live = [m == FILE_MAGIC and bool(f & FILE_RECORD_IN_USE) and b == 0 for m, f, b in zip(magic, flags, base_ref)]
+    return live + [False] * (count - len(live))
+
+# (index, live in old, live in new) for every record of a block whose header changed: it was
+# allocated or freed, or it is live in both and its sequence number or $LogFile LSN moved.
+def changed_indices(old: Dict[str, List[int]], new: Dict[str, List[int]], count: int) -> List[Tuple[int, bool, bool]]:
+    old_live = live_mask(old, count)
+    new_live = live_mask(new, count)
+    both = min(len(old['seq']), len(new['seq']))
+    if np is not None and isinstance(old_live, np.ndarray):
+        changed = old_live != new_live
+        changed[:both] |= old_live[:both] & new_live[:both] & (
+            (old['seq'][:both] != new['seq'][:both]) | (old['lsn'][:both] != new['lsn'][:both]))
+        indices = np.flatnonzero(changed)
+        return list(zip(indices.tolist(), old_live[indices].tolist(), new_live[indices].tolist()))
+
+    changes = []
+    for i in range(count):
+        if old_live[i] != new_live[i] or (old_live[i] and new_live[i] and (
+                old['seq'][i] != new['seq'][i] or old['lsn'][i] != new['lsn'][i])):
+            changes.append((i, old_live[i], new_live[i]))
+    return changes
+
+
+# Compares two snapshots of the same MFT record by record. Headers are compared a block at
+# a time (allocation state, sequence number and LSN) and only records whose header changed
+# are parsed, so an unchanged volume is diffed at roughly the speed it can be read.
+class MftDiff:
+    def __init__(self, old_file: str, new_file: str, output_file: str, debug: int = 0, verbosity: int = 0,
+                 record_size: Optional[int] = None) -> None:
+        self.old_file = old_file
+        self.new_file = new_file
+        self.output_file = output_file
+        self.debug = debug
+        self.verbosity = verbosity
+        self.requested_record_size = check_record_size(record_size) if record_size else None
+        self.record_size = MFT_RECORD_SIZE
+        self.stats = {
+            'compared_records': 0,
+            'parsed_records': 0,
+            'created': 0,
+            'deleted': 0,
+            'modified': 0,
+            'renamed': 0,
+        }
+        self.elapsed = 0.0
+
+    def log(self, message: str, level: int = 0):
+        if level <= self.debug or level <= self.verbosity:
+            print(message)
+
+    def map_file(self, file: BinaryIO) -> Union[bytes, mmap.mmap]:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty files cannot be mapped.
+            return file.read()
+
+    def record_reader(self, data: Union[bytes, mmap.mmap]):
+        record_size = self.record_size
+        return lambda recordnum: data[recordnum * record_size:(recordnum + 1) * record_size]
+
+    def detect_record_size(self, old: Union[bytes, mmap.mmap], new: Union[bytes, mmap.mmap]) -> int:
+        if self.requested_record_size:
+            return self.requested_record_size
+        sizes = {size for size in (record_size_from_header(data[:MFT_RECORD_SIZE]) for data in (old, new))
+                 if size is not None}
+        if len(sizes) > 1:
+            raise ValueError(f"The snapshots use different record sizes ({' and '.join(map(str, sorted(sizes)))} bytes)")
+        return sizes.pop() if sizes else MFT_RECORD_SIZE
+
+    def diff(self) -> None:
+        start_time = time.perf_counter()
+        with open(self.old_file, 'rb') as old_f, open(self.new_file, 'rb') as new_f:
+            old = self.map_file(old_f)
+            new = self.map_file(new_f)
+            try:
+                self.record_size = self.detect_record_size(old, new)
+                self.old_paths = LazyPaths(self.record_reader(old))
+                self.new_paths = LazyPaths(self.record_reader(new))
+                with open(self.output_file, 'w', newline='', encoding='utf-8') as output:
+                    writer = csv.writer(output)
+                    writer.writerow(DIFF_HEADER)
+                    for recordnum, old_live, new_live in self.changed_records(old, new):
+                        writer.writerows(self.changes(old, new, recordnum, old_live, new_live))
+            finally:
+                for data in (old, new):
+                    if isinstance(data, mmap.mmap):
+                        data.close()
+        self.elapsed = time.perf_counter() - start_time
+        self.print_statistics()
+
+    def changed_records(self, old: Union[bytes, mmap.mmap], new: Union[bytes, mmap.mmap]):
+        record_size = self.record_size
+        count = max(len(old), len(new)) // record_size
+        block = max(READ_BLOCK_SIZE // record_size, 1)
+        for start in range(0, count, block):
+            stop = min(start + block, count)
+            old_headers = decode_headers(old[start * record_size:stop * record_size], record_size)
+            new_headers = decode_headers(new[start * record_size:stop * record_size], record_size)
+            self.stats['compared_records'] += stop - start
+            for i, old_live, new_live in changed_indices(old_headers, new_headers, stop - start):
+                yield start + i, old_live, new_live
+
+    def parse(self, data: Union[bytes, mmap.mmap], recordnum: int) -> Optional[MftRecord]:
+        start = recordnum * self.record_size
+        try:
+            record = MftRecord(data[start:start + self.record_size], keep_raw=False, attributes=TIMESTAMP_ATTRIBUTES)
+        except Exception as e:
+            self.log(f"Error parsing record {recordnum}: {str(e)}", 1)
+            return None
+        self.stats['parsed_records'] += 1
+        return record
+
+    def changes(self, old: Union[bytes, mmap.mmap], new: Union[bytes, mmap.mmap], recordnum: int,
+                old_live: bool, new_live: bool) -> List[list]:
+        old_record = self.parse(old, recordnum) if old_live else None
+        new_record = self.parse(new, recordnum) if new_live else None
+        if old_record is not None and new_record is not None and old_record.seq == new_record.seq:
+            renamed = (old_record.filename, old_record.parent_ref) != (new_record.filename, new_record.parent_ref)
+            return [self.row('renamed' if renamed else 'modified', recordnum, old_record, new_record)]
+
+        # A new sequence number means the record was freed and reused for another file.
+        rows = []
+        if old_record is not None:
+            rows.append(self.row('deleted', recordnum, old_record, None))
+        if new_record is not None:
+            rows.append(self.row('created', recordnum, None, new_record))
+        return rows
+
+    def row(self, change: str, recordnum: int, old_record: Optional[MftRecord], new_record: Optional[MftRecord]) -> list:
+        self.stats[change] += 1
+        row = [change, recordnum]
+        sides = ((old_record, self.old_paths), (new_record, self.new_paths))
+        row += [record.seq if record is not None else '' for record, _ in sides]
+        row += [record.lsn if record is not None else '' for record, _ in sides]
+        row += [paths.path(recordnum) if record is not None else '' for record, paths in sides]
+        row += [record.filesize if record is not None else '' for record, _ in sides]
+        row += [record.si_times['mtime'].dtstr if record is not None else '' for record, _ in sides]
+        return row
+
+    def print_statistics(self) -> None:
+        print("\nMFT Diff Statistics:")
+        print(f"Records compared: {self.stats['compared_records']}")
+        print(f"Records parsed: {self.stats['parsed_records']}")
+        for change in ('created', 'deleted', 'modified', 'renamed'):
+            print(f"{change.capitalize()}: {self.stats[change]}")
+        if self.elapsed > 0:
+            print(f"Compared {self.stats['compared_records'] / self.elapsed:.0f} records/sec")
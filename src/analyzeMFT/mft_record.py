@@ -1,19 +1,66 @@
 import struct
+import traceback
 import uuid
-import hashlib
-import zlib
+from operator import attrgetter
 from .constants import *
-from .windows_time import WindowsTime
-
-from typing import Dict, Set, List, Optional, Any, Union
+from .windows_time import WindowsTime, NOT_DEFINED
+from .hashing import hash_record
+
+from typing import AbstractSet, Dict, Set, List, Optional, Any, Sequence, Union
+
+RECORD_HEADER = struct.Struct("<IHHQHHHHIIQHxxI")
+ATTRIBUTE_HEADER = struct.Struct("<LL")
+TIMESTAMPS = struct.Struct("<4Q")
+ATTRIBUTE_LIST_ENTRY = struct.Struct("<LHBBQQ")
+SECURITY_DESCRIPTOR_HEADER = struct.Struct("<BxHLLLL")
+VOLUME_INFORMATION = struct.Struct("<8xBBH")
+DATA_HEADER = struct.Struct("<8xBBH")
+RESIDENT_CONTENT = struct.Struct("<L")
+NON_RESIDENT_VCNS = struct.Struct("<QQ")
+INDEX_ROOT_HEADER = struct.Struct("<LLLB")
+REPARSE_POINT_HEADER = struct.Struct("<LH")
+EA_INFORMATION = struct.Struct("<LL")
+EA_HEADER = struct.Struct("<LBBH")
+UINT8 = struct.Struct("B")
+UINT16 = struct.Struct("<H")
+UINT32 = struct.Struct("<L")
+UINT64 = struct.Struct("<Q")
 
 
 
 class MftRecord:
-    def __init__(self, raw_record: bytes, compute_hashes: bool = False, debug_level: int = 0, logger=None):
+    # Parsed state shipped between processes by to_tuple()/from_tuple(), in tuple order.
+    TUPLE_FIELDS = (
+        'magic', 'upd_off', 'upd_cnt', 'lsn', 'seq', 'link', 'attr_off', 'flags', 'size',
+        'alloc_sizef', 'base_ref', 'next_attrid', 'recordnum', 'filename', 'si_times', 'fn_times',
+        'filesize', 'attribute_types', 'attribute_list', 'object_id', 'birth_volume_id',
+        'birth_object_id', 'birth_domain_id', 'parent_ref', 'md5', 'sha256', 'sha512', 'crc32', 'blake2b',
+        'security_descriptor', 'volume_name', 'volume_info', 'data_attribute', 'index_root',
+        'index_allocation', 'bitmap', 'reparse_point', 'ea_information', 'ea', 'logged_utility_stream'
+    )
+    # Fields exported by to_dict() for JSON/XML output, in output order.
+    DICT_FIELDS = (
+        'recordnum', 'magic', 'upd_off', 'upd_cnt', 'lsn', 'seq', 'link', 'attr_off', 'flags', 'size',
+        'alloc_sizef', 'base_ref', 'next_attrid', 'filename', 'filepath', 'parent_ref', 'filesize',
+        'si_times', 'fn_times', 'attribute_types', 'attribute_list', 'object_id', 'birth_volume_id',
+        'birth_object_id', 'birth_domain_id', 'md5', 'sha256', 'sha512', 'crc32', 'blake2b', 'security_descriptor',
+        'volume_name', 'volume_info', 'data_attribute', 'index_root', 'index_allocation', 'bitmap',
+        'reparse_point', 'ea_information', 'ea', 'logged_utility_stream'
+    )
+    TIME_KEYS = ('crtime', 'mtime', 'atime', 'ctime')
+    TUPLE_GETTER = attrgetter(*TUPLE_FIELDS)
+    SI_TIMES_INDEX = TUPLE_FIELDS.index('si_times')
+    FN_TIMES_INDEX = TUPLE_FIELDS.index('fn_times')
+    ATTRIBUTE_TYPES_INDEX = TUPLE_FIELDS.index('attribute_types')
+    __slots__ = ('raw_record', 'debug_level', 'logger', 'filepath', 'fn_namespace') + TUPLE_FIELDS
+
+    # attributes limits decoding to those attribute types (None decodes all of them); every type
+    # present is still recorded in attribute_types.
+    def __init__(self, raw_record: bytes, compute_hashes: bool = False, debug_level: int = 0, logger=None,
+                 keep_raw: bool = True, attributes: Optional[AbstractSet[int]] = None):
         self.raw_record = raw_record
         self.debug_level = debug_level
-        self.logger = logger or self._default_logger
+        self.logger = logger
         self.magic = 0
         self.upd_off = 0
         self.upd_cnt = 0
@@ -28,18 +75,10 @@ class MftRecord:
         self.next_attrid = 0
         self.recordnum = 0
         self.filename = ''
-        self.si_times = {
-            'crtime': WindowsTime(0, 0),
-            'mtime': WindowsTime(0, 0),
-            'atime': WindowsTime(0, 0),
-            'ctime': WindowsTime(0, 0)
-        }
-        self.fn_times = {
-            'crtime': WindowsTime(0, 0),
-            'mtime': WindowsTime(0, 0),
-            'atime': WindowsTime(0, 0),
-            'ctime': WindowsTime(0, 0)
-        }
+        self.filepath = ''
+        self.fn_namespace = None
+        self.si_times = dict.fromkeys(self.TIME_KEYS, NOT_DEFINED)
+        self.fn_times = dict.fromkeys(self.TIME_KEYS, NOT_DEFINED)
         self.filesize = 0
         self.attribute_types = set()
         self.attribute_list = []
@@ -52,9 +91,7 @@ class MftRecord:
         self.sha256 = None
         self.sha512 = None
         self.crc32 = None
-        if compute_hashes:
-            self.compute_hashes()
-        self.parse_record()
+        self.blake2b = None
         self.security_descriptor = None
         self.volume_name = None
         self.volume_info = None
@@ -66,81 +103,98 @@ class MftRecord:
         self.ea_information = None
         self.ea = None
         self.logged_utility_stream = None
+        if compute_hashes:
+            self.compute_hashes()
+        self.parse_record(attributes)
+        if not keep_raw:
+            self.release_raw_record()
+
+    def release_raw_record(self) -> None:
+        # Everything is decoded by now; dropping the buffer also unpins the read block it was sliced from.
+        self.raw_record = b''
+
+    def to_tuple(self) -> tuple:
+        values = list(self.TUPLE_GETTER(self))
+        for index in (self.SI_TIMES_INDEX, self.FN_TIMES_INDEX):
+            times = values[index]
+            values[index] = (times['crtime'].filetime, times['mtime'].filetime,
+                             times['atime'].filetime, times['ctime'].filetime)
+        values[self.ATTRIBUTE_TYPES_INDEX] = tuple(values[self.ATTRIBUTE_TYPES_INDEX])
+        return tuple(values)
+
+    @classmethod
+    def from_tuple(cls, values: tuple, debug_level: int = 0, logger=None) -> 'MftRecord':
+        record = cls.__new__(cls)
+        record.raw_record = b''
+        record.debug_level = debug_level
+        record.logger = logger
+        record.filepath = ''
+        for name, value in zip(cls.TUPLE_FIELDS, values):
+            setattr(record, name, value)
+        from_filetime = WindowsTime.from_filetime
+        crtime, mtime, atime, ctime = record.si_times
+        record.si_times = {'crtime': from_filetime(crtime), 'mtime': from_filetime(mtime),
+                           'atime': from_filetime(atime), 'ctime': from_filetime(ctime)}
+        crtime, mtime, atime, ctime = record.fn_times
+        record.fn_times = {'crtime': from_filetime(crtime), 'mtime': from_filetime(mtime),
+                           'atime': from_filetime(atime), 'ctime': from_filetime(ctime)}
+        record.attribute_types = set(record.attribute_types)
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        for name in self.DICT_FIELDS:
+            value = getattr(self, name)
+            if name in ('si_times', 'fn_times'):
+                value = {key: value[key].dtstr for key in self.TIME_KEYS}
+            elif name == 'attribute_types':
+                value = sorted(value)
+            data[name] = value
+        return data
 
     def _default_logger(self, message: str, level: int = 0):
         if level <= self.debug_level:
             print(message)
 
     def log(self, message: str, level: int = 0):
-        self.logger(message, level)
+        if self.logger is not None:
+            self.logger(message, level)
+        else:
+            self._default_logger(message, level)
 
-    def parse_record(self) -> None:
+    def parse_record(self, attributes: Optional[AbstractSet[int]] = None) -> None:
         try:
-            self.magic = struct.unpack("<I", self.raw_record[MFT_RECORD_MAGIC_NUMBER_OFFSET:MFT_RECORD_MAGIC_NUMBER_OFFSET+MFT_RECORD_MAGIC_NUMBER_SIZE])[0]
-            self.upd_off = struct.unpack("<H", self.raw_record[MFT_RECORD_UPDATE_SEQUENCE_OFFSET:MFT_RECORD_UPDATE_SEQUENCE_OFFSET+MFT_RECORD_UPDATE_SEQUENCE_SIZE])[0]
-            self.upd_cnt = struct.unpack("<H", self.raw_record[MFT_RECORD_UPDATE_SEQUENCE_SIZE_OFFSET:MFT_RECORD_UPDATE_SEQUENCE_SIZE_OFFSET+MFT_RECORD_UPDATE_SEQUENCE_SIZE_SIZE])[0]
-            self.lsn = struct.unpack("<Q", self.raw_record[MFT_RECORD_LOGFILE_SEQUENCE_NUMBER_OFFSET:MFT_RECORD_LOGFILE_SEQUENCE_NUMBER_OFFSET+MFT_RECORD_LOGFILE_SEQUENCE_NUMBER_SIZE])[0]
-            self.seq = struct.unpack("<H", self.raw_record[MFT_RECORD_SEQUENCE_NUMBER_OFFSET:MFT_RECORD_SEQUENCE_NUMBER_OFFSET+MFT_RECORD_SEQUENCE_NUMBER_SIZE])[0]
-            self.link = struct.unpack("<H", self.raw_record[MFT_RECORD_HARD_LINK_COUNT_OFFSET:MFT_RECORD_HARD_LINK_COUNT_OFFSET+MFT_RECORD_HARD_LINK_COUNT_SIZE])[0]
-            self.attr_off = struct.unpack("<H", self.raw_record[MFT_RECORD_FIRST_ATTRIBUTE_OFFSET:MFT_RECORD_FIRST_ATTRIBUTE_OFFSET+MFT_RECORD_FIRST_ATTRIBUTE_SIZE])[0]
-            self.flags = struct.unpack("<H", self.raw_record[MFT_RECORD_FLAGS_OFFSET:MFT_RECORD_FLAGS_OFFSET+MFT_RECORD_FLAGS_SIZE])[0]
-            self.size = struct.unpack("<I", self.raw_record[MFT_RECORD_USED_SIZE_OFFSET:MFT_RECORD_USED_SIZE_OFFSET+MFT_RECORD_USED_SIZE_SIZE])[0]
-            self.alloc_sizef = struct.unpack("<I", self.raw_record[MFT_RECORD_ALLOCATED_SIZE_OFFSET:MFT_RECORD_ALLOCATED_SIZE_OFFSET+MFT_RECORD_ALLOCATED_SIZE_SIZE])[0]
-            self.base_ref = struct.unpack("<Q", self.raw_record[MFT_RECORD_FILE_REFERENCE_OFFSET:MFT_RECORD_FILE_REFERENCE_OFFSET+MFT_RECORD_FILE_REFERENCE_SIZE])[0]
-            self.next_attrid = struct.unpack("<H", self.raw_record[MFT_RECORD_NEXT_ATTRIBUTE_ID_OFFSET:MFT_RECORD_NEXT_ATTRIBUTE_ID_OFFSET+MFT_RECORD_NEXT_ATTRIBUTE_ID_SIZE])[0]
-            self.recordnum = struct.unpack("<I", self.raw_record[MFT_RECORD_RECORD_NUMBER_OFFSET:MFT_RECORD_RECORD_NUMBER_OFFSET+MFT_RECORD_RECORD_NUMBER_SIZE])[0]
-            self.parse_attributes()
+            (self.magic, self.upd_off, self.upd_cnt, self.lsn, self.seq, self.link, self.attr_off,
+             self.flags, self.size, self.alloc_sizef, self.base_ref, self.next_attrid,
+             self.recordnum) = RECORD_HEADER.unpack_from(self.raw_record)
+            self.parse_attributes(attributes)
 
         except struct.error:
-            if hasattr(self, 'debug') and self.debug:
-                print(f"Error parsing MFT record header for record {self.recordnum}")
-
-    def parse_attributes(self):
-        offset = int(self.attr_off)
-        while offset < len(self.raw_record) - 8:
+            self.log(f"Error parsing MFT record header for record {self.recordnum}", 1)
+
+    def parse_attributes(self, attributes: Optional[AbstractSet[int]] = None):
+        decoders = self.ATTRIBUTE_DECODERS
+        raw_record = self.raw_record
+        offset = self.attr_off
+        end = len(raw_record) - 8
+        attr_type = attr_len = None
+        while offset < end:
             try:
-                self.log(f"Parsing attribute at offset {offset}", 3)
-                attr_type = int(struct.unpack("<L", self.raw_record[offset:offset+4])[0])
-                attr_len = int(struct.unpack("<L", self.raw_record[offset+4:offset+8])[0])
-                
-                self.log(f"Attribute type: {attr_type}, length: {attr_len}", 3)
+                if self.debug_level >= 3:
+                    self.log(f"Parsing attribute at offset {offset}", 3)
+                attr_type, attr_len = ATTRIBUTE_HEADER.unpack_from(raw_record, offset)
+                if self.debug_level >= 3:
+                    self.log(f"Attribute type: {attr_type}, length: {attr_len}", 3)
 
                 if attr_type == 0xffffffff or attr_len == 0:
                     self.log("End of attributes reached", 3)
                     break
-                
+
                 self.attribute_types.add(attr_type)
 
-                if attr_type == STANDARD_INFORMATION_ATTRIBUTE:
-                    self.parse_si_attribute(offset)
-                elif attr_type == FILE_NAME_ATTRIBUTE:
-                    self.parse_fn_attribute(offset)
-                elif attr_type == ATTRIBUTE_LIST_ATTRIBUTE:
-                    self.parse_attribute_list(offset)
-                elif attr_type == OBJECT_ID_ATTRIBUTE:
-                    self.parse_object_id_attribute(offset)
-                elif attr_type == SECURITY_DESCRIPTOR_ATTRIBUTE:
-                    self.parse_security_descriptor(offset)
-                elif attr_type == VOLUME_NAME_ATTRIBUTE:
-                    self.parse_volume_name(offset)
-                elif attr_type == VOLUME_INFORMATION_ATTRIBUTE:
-                    self.parse_volume_information(offset)
-                elif attr_type == DATA_ATTRIBUTE:
-                    self.parse_data(offset)
-                elif attr_type == INDEX_ROOT_ATTRIBUTE:
-                    self.parse_index_root(offset)
-                elif attr_type == INDEX_ALLOCATION_ATTRIBUTE:
-                    self.parse_index_allocation(offset)
-                elif attr_type == BITMAP_ATTRIBUTE:
-                    self.parse_bitmap(offset)
-                elif attr_type == REPARSE_POINT_ATTRIBUTE:
-                    self.parse_reparse_point(offset)
-                elif attr_type == EA_INFORMATION_ATTRIBUTE:
-                    self.parse_ea_information(offset)
-                elif attr_type == EA_ATTRIBUTE:
-                    self.parse_ea(offset)
-                elif attr_type == LOGGED_UTILITY_STREAM_ATTRIBUTE:
-                    self.parse_logged_utility_stream(offset)
+                decoder = decoders.get(attr_type)
+                if decoder is not None and (attributes is None or attr_type in attributes):
+                    decoder(self, offset)
 
                 offset += attr_len
 
@@ -149,38 +203,42 @@ class MftRecord:
                 print(f"attr_type: {attr_type} (type: {type(attr_type)})")
                 print(f"attr_len: {attr_len} (type: {type(attr_len)})")
                 print(f"offset: {offset}")
-                if self.debug >= 2:
+                if self.debug_level >= 2:
                     traceback.print_exc()
                 offset += 1
 
     def parse_si_attribute(self, offset: int) -> None:
-        si_data = self.raw_record[offset+24:offset+72]
-        if len(si_data) >= 32:
-            try:
-                self.si_times = {
-                    'crtime': WindowsTime(struct.unpack("<L", si_data[:4])[0], struct.unpack("<L", si_data[4:8])[0]),
-                    'mtime': WindowsTime(struct.unpack("<L", si_data[8:12])[0], struct.unpack("<L", si_data[12:16])[0]),
-                    'ctime': WindowsTime(struct.unpack("<L", si_data[16:20])[0], struct.unpack("<L", si_data[20:24])[0]),
-                    'atime': WindowsTime(struct.unpack("<L", si_data[24:28])[0], struct.unpack("<L", si_data[28:32])[0])
-                }
-            except struct.error:
-                pass
+        if len(self.raw_record) >= offset + 56:
+            crtime, mtime, ctime, atime = TIMESTAMPS.unpack_from(self.raw_record, offset + 24)
+            self.si_times = {
+                'crtime': WindowsTime.from_filetime(crtime),
+                'mtime': WindowsTime.from_filetime(mtime),
+                'ctime': WindowsTime.from_filetime(ctime),
+                'atime': WindowsTime.from_filetime(atime)
+            }
 
+    # The same $FILE_NAME as locate_attributes picks for paths: the first long name, or a DOS
+    # 8.3 name until a long one turns up.
     def parse_fn_attribute(self, offset: int) -> None:
-        fn_data = self.raw_record[offset+24:]
-        if len(fn_data) >= 64:
+        if self.fn_namespace not in (None, DOS_NAMESPACE):
+            return
+        raw_record = self.raw_record
+        base = offset + 24
+        if len(raw_record) >= base + 64:
             try:
+                crtime, mtime, ctime, atime = TIMESTAMPS.unpack_from(raw_record, base + 8)
                 self.fn_times = {
-                    'crtime': WindowsTime(struct.unpack("<L", fn_data[8:12])[0], struct.unpack("<L", fn_data[12:16])[0]),
-                    'mtime': WindowsTime(struct.unpack("<L", fn_data[16:20])[0], struct.unpack("<L", fn_data[20:24])[0]),
-                    'ctime': WindowsTime(struct.unpack("<L", fn_data[24:28])[0], struct.unpack("<L", fn_data[28:32])[0]),
-                    'atime': WindowsTime(struct.unpack("<L", fn_data[32:36])[0], struct.unpack("<L", fn_data[36:40])[0])
+                    'crtime': WindowsTime.from_filetime(crtime),
+                    'mtime': WindowsTime.from_filetime(mtime),
+                    'ctime': WindowsTime.from_filetime(ctime),
+                    'atime': WindowsTime.from_filetime(atime)
                 }
-                self.filesize = struct.unpack("<Q", fn_data[48:56])[0]
-                name_len = struct.unpack("B", fn_data[64:65])[0]
-                if len(fn_data) >= 66 + name_len * 2:
-                    self.filename = fn_data[66:66+name_len*2].decode('utf-16-le', errors='replace')
-                self.parent_ref = struct.unpack("<Q", fn_data[:8])[0] & 0x0000FFFFFFFFFFFF
+                self.filesize = UINT64.unpack_from(raw_record, base + 48)[0]
+                name_len = UINT8.unpack_from(raw_record, base + 64)[0]
+                if len(raw_record) >= base + 66 + name_len * 2:
+                    self.filename = str(raw_record[base+66:base+66+name_len*2], 'utf-16-le', errors='replace')
+                self.parent_ref = UINT64.unpack_from(raw_record, base)[0] & 0x0000FFFFFFFFFFFF
+                self.fn_namespace = UINT8.unpack_from(raw_record, base + 65)[0]
             except struct.error:
                 pass
 
@@ -188,36 +246,32 @@ class MftRecord:
         obj_id_data = self.raw_record[offset+24:offset+88]
         if len(obj_id_data) >= 64:
             try:
-                self.object_id = str(uuid.UUID(bytes_le=obj_id_data[:16]))
-                self.birth_volume_id = str(uuid.UUID(bytes_le=obj_id_data[16:32]))
-                self.birth_object_id = str(uuid.UUID(bytes_le=obj_id_data[32:48]))
-                self.birth_domain_id = str(uuid.UUID(bytes_le=obj_id_data[48:64]))
+                self.object_id = str(uuid.UUID(bytes_le=bytes(obj_id_data[:16])))
+                self.birth_volume_id = str(uuid.UUID(bytes_le=bytes(obj_id_data[16:32])))
+                self.birth_object_id = str(uuid.UUID(bytes_le=bytes(obj_id_data[32:48])))
+                self.birth_domain_id = str(uuid.UUID(bytes_le=bytes(obj_id_data[48:64])))
             except (struct.error, ValueError):
-                if self.debug:
-                    print(f"Error parsing Object ID attribute for record {self.recordnum}")
+                self.log(f"Error parsing Object ID attribute for record {self.recordnum}", 1)
     
     def get_parent_record_num(self) -> int:
         return self.parent_ref & 0x0000FFFFFFFFFFFF
 
     def parse_attribute_list(self, offset: int) -> None:
-        attr_content_offset = offset + struct.unpack("<H", self.raw_record[offset+20:offset+22])[0]
-        attr_content_end = offset + struct.unpack("<L", self.raw_record[offset+4:offset+8])[0]
+        raw_record = self.raw_record
+        attr_content_offset = offset + UINT16.unpack_from(raw_record, offset + 20)[0]
+        attr_content_end = offset + UINT32.unpack_from(raw_record, offset + 4)[0]
         
         while attr_content_offset < attr_content_end:
             try:
-                attr_type = struct.unpack("<L", self.raw_record[attr_content_offset:attr_content_offset+4])[0]
-                attr_len = struct.unpack("<H", self.raw_record[attr_content_offset+4:attr_content_offset+6])[0]
-                name_len = struct.unpack("B", self.raw_record[attr_content_offset+6:attr_content_offset+7])[0]
-                name_offset = struct.unpack("B", self.raw_record[attr_content_offset+7:attr_content_offset+8])[0]
+                attr_type, attr_len, name_len, name_offset, vcn, ref = ATTRIBUTE_LIST_ENTRY.unpack_from(raw_record, attr_content_offset)
+                if attr_len == 0:
+                    break
                 
                 if name_len > 0:
-                    name = self.raw_record[attr_content_offset+name_offset:attr_content_offset+name_offset+name_len*2].decode('utf-16-le', errors='replace')
+                    name = str(raw_record[attr_content_offset+name_offset:attr_content_offset+name_offset+name_len*2], 'utf-16-le', errors='replace')
                 else:
                     name = ""
                 
-                vcn = struct.unpack("<Q", self.raw_record[attr_content_offset+8:attr_content_offset+16])[0]
-                ref = struct.unpack("<Q", self.raw_record[attr_content_offset+16:attr_content_offset+24])[0]
-                
                 self.attribute_list.append({
                     'type': attr_type,
                     'name': name,
@@ -230,88 +284,62 @@ class MftRecord:
                 break
 
     def parse_security_descriptor(self, offset: int) -> None:
-        sd_data = self.raw_record[offset+24:]
-        if len(sd_data) >= 20:
-            try:
-                revision = struct.unpack("B", sd_data[0:1])[0]
-                control = struct.unpack("<H", sd_data[2:4])[0]
-                owner_offset = struct.unpack("<L", sd_data[4:8])[0]
-                group_offset = struct.unpack("<L", sd_data[8:12])[0]
-                sacl_offset = struct.unpack("<L", sd_data[12:16])[0]
-                dacl_offset = struct.unpack("<L", sd_data[16:20])[0]
-                
-                self.security_descriptor = {
-                    'revision': revision,
-                    'control': control,
-                    'owner_offset': owner_offset,
-                    'group_offset': group_offset,
-                    'sacl_offset': sacl_offset,
-                    'dacl_offset': dacl_offset
-                }
-            except struct.error:
-                if self.debug:
-                    print(f"Error parsing Security Descriptor attribute for record {self.recordnum}")
+        if len(self.raw_record) >= offset + 44:
+            revision, control, owner_offset, group_offset, sacl_offset, dacl_offset = SECURITY_DESCRIPTOR_HEADER.unpack_from(self.raw_record, offset + 24)
+            self.security_descriptor = {
+                'revision': revision,
+                'control': control,
+                'owner_offset': owner_offset,
+                'group_offset': group_offset,
+                'sacl_offset': sacl_offset,
+                'dacl_offset': dacl_offset
+            }
 
     def parse_volume_name(self, offset: int) -> None:
-        vn_data = self.raw_record[offset+24:]
         try:
-            name_length = struct.unpack("<H", vn_data[:2])[0]
-            self.volume_name = vn_data[2:2+name_length*2].decode('utf-16-le', errors='replace')
+            name_length = UINT16.unpack_from(self.raw_record, offset + 24)[0]
+            self.volume_name = str(self.raw_record[offset+26:offset+26+name_length*2], 'utf-16-le', errors='replace')
         except struct.error:
-            if self.debug:
-                print(f"Error parsing Volume Name attribute for record {self.recordnum}")
+            self.log(f"Error parsing Volume Name attribute for record {self.recordnum}", 1)
 
     def parse_volume_information(self, offset: int) -> None:
-        vi_data = self.raw_record[offset+24:offset+48]
-        if len(vi_data) >= 12:
-            try:
-                self.volume_info = {
-                    'major_version': struct.unpack("B", vi_data[8:9])[0],
-                    'minor_version': struct.unpack("B", vi_data[9:10])[0],
-                    'flags': struct.unpack("<H", vi_data[10:12])[0]
-                }
-            except struct.error:
-                if self.debug:
-                    print(f"Error parsing Volume Information attribute for record {self.recordnum}")
+        if len(self.raw_record) >= offset + 36:
+            major_version, minor_version, flags = VOLUME_INFORMATION.unpack_from(self.raw_record, offset + 24)
+            self.volume_info = {
+                'major_version': major_version,
+                'minor_version': minor_version,
+                'flags': flags
+            }
 
     def parse_data(self, offset):
-        data_header = self.raw_record[offset:offset+24]
+        raw_record = self.raw_record
         try:
-            non_resident_flag = struct.unpack("B", data_header[8:9])[0]
-            name_length = struct.unpack("B", data_header[9:10])[0]
-            name_offset = struct.unpack("<H", data_header[10:12])[0]
+            non_resident_flag, name_length, name_offset = DATA_HEADER.unpack_from(raw_record, offset)
             if name_length > 0:
-                name = self.raw_record[offset+name_offset:offset+name_offset+name_length*2].decode('utf-16-le', errors='replace')
+                name = str(raw_record[offset+name_offset:offset+name_offset+name_length*2], 'utf-16-le', errors='replace')
             else:
                 name = ""
             
             if non_resident_flag == 0:  # Resident
-                content_size = struct.unpack("<L", data_header[16:20])[0]
-                content_offset = struct.unpack("<H", data_header[20:22])[0]
-                content = self.raw_record[offset+content_offset:offset+content_offset+content_size]
+                content_size = RESIDENT_CONTENT.unpack_from(raw_record, offset + 16)[0]
+                start_vcn = last_vcn = None
             else:  # Non-resident
-                start_vcn = struct.unpack("<Q", data_header[16:24])[0]
-                last_vcn = struct.unpack("<Q", self.raw_record[offset+24:offset+32])[0]
+                content_size = None
+                start_vcn, last_vcn = NON_RESIDENT_VCNS.unpack_from(raw_record, offset + 16)
                 
             self.data_attribute = {
                 'name': name,
                 'non_resident': bool(non_resident_flag),
-                'content_size': content_size if non_resident_flag == 0 else None,
-                'start_vcn': start_vcn if non_resident_flag != 0 else None,
-                'last_vcn': last_vcn if non_resident_flag != 0 else None
+                'content_size': content_size,
+                'start_vcn': start_vcn,
+                'last_vcn': last_vcn
             }
         except struct.error:
-            if self.debug:
-                print(f"Error parsing Data attribute for record {self.recordnum}")
+            self.log(f"Error parsing Data attribute for record {self.recordnum}", 1)
 
     def parse_index_root(self, offset: int) -> None:
-        ir_data = self.raw_record[offset+24:]
         try:
-            attr_type = struct.unpack("<L", ir_data[:4])[0]
-            collation_rule = struct.unpack("<L", ir_data[4:8])[0]
-            index_alloc_size = struct.unpack("<L", ir_data[8:12])[0]
-            clusters_per_index = struct.unpack("B", ir_data[12:13])[0]
-            
+            attr_type, collation_rule, index_alloc_size, clusters_per_index = INDEX_ROOT_HEADER.unpack_from(self.raw_record, offset + 24)
             self.index_root = {
                 'attr_type': attr_type,
                 'collation_rule': collation_rule,
@@ -319,93 +347,95 @@ class MftRecord:
                 'clusters_per_index': clusters_per_index
             }
         except struct.error:
-            if self.debug:
-                print(f"Error parsing Index Root attribute for record {self.recordnum}")
+            self.log(f"Error parsing Index Root attribute for record {self.recordnum}", 1)
 
     def parse_index_allocation(self, offset: int) -> None:
-        ia_data = self.raw_record[offset+24:]
         try:
-            data_runs_offset = struct.unpack("<H", ia_data[:2])[0]
+            data_runs_offset = UINT16.unpack_from(self.raw_record, offset + 24)[0]
             self.index_allocation = {
                 'data_runs_offset': data_runs_offset
             }
         except struct.error:
-            if self.debug:
-                print(f"Error parsing Index Allocation attribute for record {self.recordnum}")
+            self.log(f"Error parsing Index Allocation attribute for record {self.recordnum}", 1)
 
     def parse_bitmap(self, offset: int) -> None:
-        bitmap_data = self.raw_record[offset+24:]
         try:
-            bitmap_size = struct.unpack("<L", bitmap_data[:4])[0]
+            bitmap_size = UINT32.unpack_from(self.raw_record, offset + 24)[0]
             self.bitmap = {
                 'size': bitmap_size,
-                'data': bitmap_data[4:4+bitmap_size]
+                'data': bytes(self.raw_record[offset+28:offset+28+bitmap_size])
             }
         except struct.error:
-            if self.debug:
-                print(f"Error parsing Bitmap attribute for record {self.recordnum}")
+            self.log(f"Error parsing Bitmap attribute for record {self.recordnum}", 1)
 
     def parse_reparse_point(self, offset: int) -> None:
-        rp_data = self.raw_record[offset+24:]
         try:
-            reparse_tag = struct.unpack("<L", rp_data[:4])[0]
-            reparse_data_length = struct.unpack("<H", rp_data[4:6])[0]
+            reparse_tag, reparse_data_length = REPARSE_POINT_HEADER.unpack_from(self.raw_record, offset + 24)
             self.reparse_point = {
                 'reparse_tag': reparse_tag,
                 'data_length': reparse_data_length,
-                'data': rp_data[8:8+reparse_data_length]
+                'data': bytes(self.raw_record[offset+32:offset+32+reparse_data_length])
             }
         except struct.error:
-            if self.debug:
-                print(f"Error parsing Reparse Point attribute for record {self.recordnum}")
+            self.log(f"Error parsing Reparse Point attribute for record {self.recordnum}", 1)
 
     def parse_ea_information(self, offset: int) -> None:
-        eai_data = self.raw_record[offset+24:]
         try:
-            ea_size = struct.unpack("<L", eai_data[:4])[0]
-            ea_count = struct.unpack("<L", eai_data[4:8])[0]
+            ea_size, ea_count = EA_INFORMATION.unpack_from(self.raw_record, offset + 24)
             self.ea_information = {
                 'ea_size': ea_size,
                 'ea_count': ea_count
             }
         except struct.error:
-            if self.debug:
-                print(f"Error parsing EA Information attribute for record {self.recordnum}")
+            self.log(f"Error parsing EA Information attribute for record {self.recordnum}", 1)
 
     def parse_ea(self, offset: int) -> None:
-        ea_data = self.raw_record[offset+24:]
+        raw_record = self.raw_record
         try:
-            next_entry_offset = struct.unpack("<L", ea_data[:4])[0]
-            flags = struct.unpack("B", ea_data[4:5])[0]
-            name_length = struct.unpack("B", ea_data[5:6])[0]
-            value_length = struct.unpack("<H", ea_data[6:8])[0]
-            name = ea_data[8:8+name_length].decode('ascii', errors='replace')
-            value = ea_data[8+name_length:8+name_length+value_length]
-            
+            next_entry_offset, flags, name_length, value_length = EA_HEADER.unpack_from(raw_record, offset + 24)
+            name_start = offset + 32
+            value_start = name_start + name_length
             self.ea = {
                 'next_entry_offset': next_entry_offset,
                 'flags': flags,
-                'name': name,
-                'value': value
+                'name': str(raw_record[name_start:value_start], 'ascii', errors='replace'),
+                'value': bytes(raw_record[value_start:value_start+value_length])
             }
         except struct.error:
-            if self.debug:
-                print(f"Error parsing EA attribute for record {self.recordnum}")
+            self.log(f"Error parsing EA attribute for record {self.recordnum}", 1)
 
     def parse_logged_utility_stream(self, offset: int) -> None:
-        lus_data = self.raw_record[offset+24:]
         try:
-            stream_size = struct.unpack("<Q", lus_data[:8])[0]
+            stream_size = UINT64.unpack_from(self.raw_record, offset + 24)[0]
             self.logged_utility_stream = {
                 'size': stream_size,
-                'data': lus_data[8:8+stream_size]
+                'data': bytes(self.raw_record[offset+32:offset+32+stream_size])
             }
         except struct.error:
-            if self.debug:
-                print(f"Error parsing Logged Utility Stream attribute for record {self.recordnum}")
-
-
-    def to_csv(self) -> List[Union[str, int]]:
+            self.log(f"Error parsing Logged Utility Stream attribute for record {self.recordnum}", 1)
+
+    # Decoder for each attribute type, called with the attribute's offset; other types are
+    # only recorded in attribute_types.
+    ATTRIBUTE_DECODERS = {
+        STANDARD_INFORMATION_ATTRIBUTE: parse_si_attribute,
+        ATTRIBUTE_LIST_ATTRIBUTE: parse_attribute_list,
+        FILE_NAME_ATTRIBUTE: parse_fn_attribute,
+        OBJECT_ID_ATTRIBUTE: parse_object_id_attribute,
+        SECURITY_DESCRIPTOR_ATTRIBUTE: parse_security_descriptor,
+        VOLUME_NAME_ATTRIBUTE: parse_volume_name,
+        VOLUME_INFORMATION_ATTRIBUTE: parse_volume_information,
+        DATA_ATTRIBUTE: parse_data,
+        INDEX_ROOT_ATTRIBUTE: parse_index_root,
+        INDEX_ALLOCATION_ATTRIBUTE: parse_index_allocation,
+        BITMAP_ATTRIBUTE: parse_bitmap,
+        REPARSE_POINT_ATTRIBUTE: parse_reparse_point,
+        EA_INFORMATION_ATTRIBUTE: parse_ea_information,
+        EA_ATTRIBUTE: parse_ea,
+        LOGGED_UTILITY_STREAM_ATTRIBUTE: parse_logged_utility_stream,
+    }
+
+    # extra_hashes are hashes without a CSV_HEADER column, appended in that order.
+    def to_csv(self, extra_hashes: Sequence[str] = ()) -> List[Union[str, int]]:
         row = [
             self.recordnum,
             "Valid" if self.magic == int.from_bytes(MFT_RECORD_MAGIC, BYTE_ORDER) else "Invalid",
@@ -416,7 +446,7 @@ class MftRecord:
             self.base_ref >> 48,
             
             self.filename,
-            "",  # Filepath (to be filled later)
+            self.filepath,
             
             self.si_times['crtime'].dtstr,
             self.si_times['mtime'].dtstr,
@@ -460,25 +490,17 @@ class MftRecord:
             str(self.ea),
             str(self.logged_utility_stream)
         ]
-        if self.md5 is not None:
-            row.extend([self.md5, self.sha256, self.sha512, self.crc32])
-        else:
-            row.extend([""] * 4)  # Add empty strings for hash fields if not computed
+        # Empty strings for hashes that were not computed
+        row.extend(getattr(self, name) or "" for name in CSV_HASH_ALGORITHMS)
+        row.extend(getattr(self, name) or "" for name in extra_hashes)
         return row
 
-    def compute_hashes(self) -> None:
-        md5 = hashlib.md5()
-        sha256 = hashlib.sha256()
-        sha512 = hashlib.sha512()
-        
-        md5.update(self.raw_record)
-        sha256.update(self.raw_record)
-        sha512.update(self.raw_record)
-        
-        self.md5 = md5.hexdigest()
-        self.sha256 = sha256.hexdigest()
-        self.sha512 = sha512.hexdigest()
-        self.crc32 = format(zlib.crc32(self.raw_record) & 0xFFFFFFFF, '08x')
+    def compute_hashes(self, algorithms: List[str] = DEFAULT_HASH_ALGORITHMS) -> None:
+        self.apply_hashes(hash_record(self.raw_record, algorithms))
+
+    def apply_hashes(self, hashes: Dict[str, str]) -> None:
+        for name, digest in hashes.items():
+            setattr(self, name, digest)
 
     def get_file_type(self)-> str:
         if self.flags & FILE_RECORD_IS_DIRECTORY:
@@ -0,0 +1,190 @@
+import struct
+from array import array
+from typing import Callable, Optional, Tuple, Union
+from .constants import *
+from .lru_cache import LRUCache
+
+HEADER = struct.Struct("<4s12xHxxHH")       # magic, sequence number, first attribute offset, flags
+ATTRIBUTE_HEADER = struct.Struct("<LL")     # attribute type, attribute length
+RESIDENT_CONTENT_OFFSET = struct.Struct("<H")
+FILE_NAME_PARENT = struct.Struct("<Q")
+
+NO_PARENT = 0xFFFFFFFF
+
+
+# Walks only the record header and attribute headers up to $FILE_NAME and returns the content
+# offsets of the resident $STANDARD_INFORMATION and $FILE_NAME (None when missing), preferring
+# a long name over a DOS 8.3 one.
+def locate_attributes(raw_record: Union[bytes, memoryview]) -> Tuple[Optional[int], Optional[int]]:
+    si = fn = None
+    offset = HEADER.unpack_from(raw_record)[2]
+    end = len(raw_record) - ATTRIBUTE_HEADER.size
+    while offset < end:
+        attr_type, attr_len = ATTRIBUTE_HEADER.unpack_from(raw_record, offset)
+        if attr_type == 0xffffffff or attr_len == 0:
+            break
+        if attr_type == FILE_NAME_ATTRIBUTE and raw_record[offset + 8] == 0:
+            content = offset + RESIDENT_CONTENT_OFFSET.unpack_from(raw_record, offset + 20)[0]
+            if content + 66 <= len(raw_record):
+                fn = content
+                if raw_record[content + 65] != DOS_NAMESPACE:
+                    break
+        elif attr_type == STANDARD_INFORMATION_ATTRIBUTE and si is None and raw_record[offset + 8] == 0:
+            content = offset + RESIDENT_CONTENT_OFFSET.unpack_from(raw_record, offset + 20)[0]
+            if content + 32 <= len(raw_record):
+                si = content
+        if attr_type > FILE_NAME_ATTRIBUTE:
+            break
+        offset += attr_len
+    return si, fn
+
+# (parent record number, parent sequence, name) from the preferred $FILE_NAME.
+def scan_file_name(raw_record: Union[bytes, memoryview]) -> Optional[Tuple[int, int, str]]:
+    content = locate_attributes(raw_record)[1]
+    if content is None:
+        return None
+    parent_ref = FILE_NAME_PARENT.unpack_from(raw_record, content)[0]
+    name_len = raw_record[content + 64]
+    name = str(raw_record[content + 66:content + 66 + name_len * 2], 'utf-16-le', errors='replace')
+    return parent_ref & 0x0000FFFFFFFFFFFF, parent_ref >> 48, name
+
+
+# Parent links for every record, kept in compact columns indexed by record number
+# so full paths can be resolved without holding MftRecord objects.
+class ParentIndex:
+    def __init__(self) -> None:
+        self.parent = array('I')
+        self.parent_seq = array('H')
+        self.seq = array('H')
+        self.in_use = array('B')
+        self.name_offset = array('I')   # into names, which stays far below 4 GiB
+        self.name_length = array('H')
+        self.names = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def __contains__(self, recordnum: int) -> bool:
+        return 0 <= recordnum < len(self.parent) and self.parent[recordnum] != NO_PARENT
+
+    def add(self, raw_record: Union[bytes, memoryview]) -> None:
+        entry = None
+        seq = flags = 0
+        try:
+            magic, seq, _, flags = HEADER.unpack_from(raw_record)
+            if magic == MFT_RECORD_MAGIC:
+                entry = scan_file_name(raw_record)
+        except (struct.error, IndexError):
+            pass
+
+        self.seq.append(seq)
+        self.in_use.append(1 if flags & FILE_RECORD_IN_USE else 0)
+        if entry is None:
+            self.parent.append(NO_PARENT)
+            self.parent_seq.append(0)
+            self.name_offset.append(0)
+            self.name_length.append(0)
+            return
+
+        parent, parent_seq, name = entry
+        encoded = name.encode('utf-8')
+        self.parent.append(parent if parent < NO_PARENT else NO_PARENT)
+        self.parent_seq.append(parent_seq)
+        self.name_offset.append(len(self.names))
+        self.name_length.append(len(encoded))
+        self.names += encoded
+
+    def name(self, recordnum: int) -> str:
+        start = self.name_offset[recordnum]
+        return self.names[start:start + self.name_length[recordnum]].decode('utf-8')
+
+    def parent_of(self, recordnum: int) -> Optional[int]:
+        parent = self.parent[recordnum]
+        if parent not in self:
+            return None
+        if self.parent_seq[recordnum] in (0, self.seq[parent]):
+            return parent
+        # A directory that was deleted but not reused has had its sequence bumped once.
+        if not self.in_use[parent] and self.seq[parent] == (self.parent_seq[recordnum] + 1) & 0xFFFF:
+            return parent
+        return None
+
+
+# Full paths resolved on demand by reading just the $FILE_NAME of each ancestor, for when only
+# a handful of records are wanted and a full ParentIndex pass would cost more than it saves.
+# read_record(n) returns record n's raw bytes (empty past the end); directory paths are cached
+# by (record number, sequence). Paths come out as MftAnalyzer.build_indexed_filepath builds them.
+class LazyPaths:
+    def __init__(self, read_record: Callable[[int], bytes]) -> None:
+        self.read_record = read_record
+        self.cache = LRUCache(PATH_CACHE_SIZE)
+
+    def entry(self, recordnum: int, raw: Optional[bytes] = None) -> Optional[Tuple[int, int, int, int, str]]:
+        # (sequence, flags, parent record number, parent sequence, name)
+        if recordnum < 0:
+            return None
+        if raw is None:
+            raw = self.read_record(recordnum)
+        try:
+            magic, seq, _, flags = HEADER.unpack_from(raw)
+            found = scan_file_name(raw) if magic == MFT_RECORD_MAGIC else None
+        except (struct.error, IndexError):
+            return None
+        if found is None:
+            return None
+        return (seq, flags) + found
+
+    def links_to(self, entry: Tuple, parent_entry: Optional[Tuple]) -> bool:
+        # The same test as ParentIndex.parent_of.
+        if parent_entry is None:
+            return False
+        parent_seq, seq, flags = entry[3], parent_entry[0], parent_entry[1]
+        if parent_seq in (0, seq):
+            return True
+        return not flags & FILE_RECORD_IN_USE and seq == (parent_seq + 1) & 0xFFFF
+
+    def path(self, recordnum: int, name: Optional[str] = None, raw: Optional[bytes] = None) -> str:
+        # name overrides the one scanned from the record, e.g. the name MftRecord settled on;
+        # raw is the record itself when the caller already read it.
+        if recordnum == 5:
+            return ""
+        entry = self.entry(recordnum, raw)
+        if entry is None:
+            return f"Unknown_{recordnum}"
+        name = name or entry[4] or f"Unknown_{recordnum}"
+        parent = entry[2]
+        if parent == recordnum:
+            return f"OrphanedFiles\\{name}"
+        parent_entry = self.entry(parent)
+        if not self.links_to(entry, parent_entry):
+            return f"UnknownParent_{parent}\\{name}"
+        return f"{self.directory_path(parent, parent_entry)}\\{name}"
+
+    def directory_path(self, recordnum: int, entry: Tuple) -> str:
+        chain = []
+        current = recordnum
+        while True:
+            prefix = self.cache.get((current, entry[0]))
+            if prefix is not None:
+                break
+            if current == 5:
+                prefix = ""
+                break
+            if len(chain) >= 255:
+                prefix = "DeepPath"
+                break
+            chain.append((current, entry))
+            parent = entry[2]
+            if parent == current:
+                prefix = "OrphanedFiles"
+                break
+            parent_entry = self.entry(parent)
+            if not self.links_to(entry, parent_entry):
+                prefix = f"UnknownParent_{parent}"
+                break
+            current, entry = parent, parent_entry
+
+        for directory, directory_entry in reversed(chain):
+            prefix = f"{prefix}\\{directory_entry[4] or f'Unknown_{directory}'}"
+            self.cache.put((directory, directory_entry[0]), prefix)
+        return prefix
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from .constants import *
+from .mft_record import MftRecord
+
+TRAILER = struct.Struct("<Q8s")  # footer offset, magic
+ALIGNMENT = 8
+
+# Fixed-width columns taken from MftRecord.to_tuple(): (field, array typecode)
+INT_COLUMNS = (
+    ('magic', 'I'), ('upd_off', 'H'), ('upd_cnt', 'H'), ('lsn', 'Q'), ('seq', 'H'), ('link', 'H'),
+    ('attr_off', 'H'), ('flags', 'H'), ('size', 'I'), ('alloc_sizef', 'I'), ('base_ref', 'Q'),
+    ('next_attrid', 'H'), ('recordnum', 'I'), ('filesize', 'Q'), ('parent_ref', 'Q'),
+)
+TIME_COLUMNS = ('si_times', 'fn_times')
+# Text columns, stored as offsets into a per-block UTF-8 heap plus a None mask
+STRING_COLUMNS = (
+    'filename', 'object_id', 'birth_volume_id', 'birth_object_id', 'birth_domain_id', 'volume_name',
+) + tuple(HASH_ALGORITHMS)
+# Nested attribute details, marshalled per record into a second heap
+DETAIL_COLUMNS = (
+    'attribute_list', 'security_descriptor', 'volume_info', 'data_attribute', 'index_root',
+    'index_allocation', 'bitmap', 'reparse_point', 'ea_information', 'ea', 'logged_utility_stream',
+)
+
+FIELD_POSITIONS = {name: i for i, name in enumerate(MftRecord.TUPLE_FIELDS)}
+
+
+def input_key(file: BinaryIO) -> Tuple[int, str]:
+    file.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = file.read(READ_BLOCK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    return size, digest.hexdigest()
+
+def padding(length: int) -> bytes:
+    return b'\0' * (-length % ALIGNMENT)
+
+# Attribute types are kept as a bitmask of the standard codes (multiples of 0x10 up to 0x1f0);
+# anything else goes into the record's detail blob.
+def split_attribute_types(types) -> Tuple[int, tuple]:
+    mask = 0
+    extra = []
+    for attr_type in types:
+        if attr_type % 0x10 == 0 and attr_type < 0x200:
+            mask |= 1 << (attr_type >> 4)
+        else:
+            extra.append(attr_type)
+    return mask, tuple(extra)
+
+def mask_to_types(mask: int) -> tuple:
+    return tuple(bit << 4 for bit in range(32) if mask >> bit & 1)
+
+
+# Parsed records in a compact columnar file, written one row group per block. Each group holds
+# fixed-width arrays per field followed by the string and detail heaps; a JSON footer records
+# where the groups are and which input (size and SHA-256) and parse options produced them,
+# along with the input's record counts and the digests of records that were never written
+# (zeroed or repeated record numbers replaced within a block), so a replay reports the same stats.
+# The file is written under a temporary name and only renamed into place by close().
+class RecordCacheWriter:
+    def __init__(self, output_file: str, key: Dict[str, Any]) -> None:
+        self.output_file = output_file
+        self.temp_file = output_file + '.tmp'
+        self.key = key
+        self.file: Optional[BinaryIO] = None
+        self.groups: List[Tuple[int, int]] = []
+        self.records = 0
+        self.dropped_digests: Dict[str, set] = {}
+
+    def open(self) -> None:
+        self.file = open(self.temp_file, 'wb')
+        self.file.write(RECORD_CACHE_MAGIC)
+
+    def write_block(self, records: List[MftRecord]) -> None:
+        if not records:
+            return
+        columns = list(zip(*(record.to_tuple() for record in records)))
+        parts = []
+
+        def add(data: bytes) -> None:
+            parts.append(data)
+            parts.append(padding(len(data)))
+
+        for name, typecode in INT_COLUMNS:
+            add(array(typecode, columns[FIELD_POSITIONS[name]]).tobytes())
+        for name in TIME_COLUMNS:
+            times = columns[FIELD_POSITIONS[name]]
+            for i in range(4):
+                add(array('Q', [filetimes[i] for filetimes in times]).tobytes())
+
+        masks = []
+        extras = []
+        for types in columns[FIELD_POSITIONS['attribute_types']]:
+            mask, extra = split_attribute_types(types)
+            masks.append(mask)
+            extras.append(extra)
+        add(array('I', masks).tobytes())
+
+        for values in [columns[FIELD_POSITIONS[name]] for name in STRING_COLUMNS] + [[r.filepath for r in records]]:
+            add(array('B', [value is None for value in values]).tobytes())
+            self.add_heap(add, [(value or '').encode('utf-8', 'surrogatepass') for value in values])
+
+        details = zip(extras, *(columns[FIELD_POSITIONS[name]] for name in DETAIL_COLUMNS))
+        self.add_heap(add, [marshal.dumps(detail) for detail in details])
+
+        self.groups.append((self.file.tell(), len(records)))
+        self.file.write(b''.join(parts))
+        self.records += len(records)
+
+    def add_dropped(self, hashes: Dict[str, str]) -> None:
+        for name, digest in hashes.items():
+            if digest:
+                self.dropped_digests.setdefault(name, set()).add(digest)
+
+    def add_heap(self, add, items: List[bytes]) -> None:
+        offsets = array('Q', [0])
+        offsets.extend(accumulate(map(len, items)))
+        add(offsets.tobytes())
+        add(b''.join(items))
+
+    def close(self, stats: Optional[Dict[str, int]] = None) -> None:
+        if self.file is None:
+            return
+        footer = json.dumps({
+            'version': RECORD_CACHE_VERSION,
+            'byteorder': sys.byteorder,
+            'marshal_version': marshal.version,
+            'key': self.key,
+            'records': self.records,
+            'groups': self.groups,
+            'stats': stats or {},
+            'dropped_digests': {name: sorted(digests) for name, digests in self.dropped_digests.items()},
+        }).encode('utf-8')
+        offset = self.file.tell()
+        self.file.write(footer)
+        self.file.write(TRAILER.pack(offset, RECORD_CACHE_MAGIC))
+        self.file.close()
+        self.file = None
+        os.replace(self.temp_file, self.output_file)
+
+    def discard(self) -> None:
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        os.remove(self.temp_file)
+
+
+# Memory-mapped reader for a RecordCacheWriter file. Rebuilds MftRecords through
+# MftRecord.from_tuple() one row group at a time, with filepath already resolved.
+class RecordCache:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, 'rb')
+        self.mapped = None
+        try:
+            self.mapped = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self.mapped) < len(RECORD_CACHE_MAGIC) + TRAILER.size or \
+                    self.mapped[:len(RECORD_CACHE_MAGIC)] != RECORD_CACHE_MAGIC:
+                raise ValueError(f"{path} is not a record cache")
+            offset, magic = TRAILER.unpack_from(self.mapped, len(self.mapped) - TRAILER.size)
+            if magic != RECORD_CACHE_MAGIC:
+                raise ValueError(f"{path} is incomplete")
+            self.footer = json.loads(self.mapped[offset:len(self.mapped) - TRAILER.size])
+        except Exception:
+            self.close()
+            raise
+
+    @classmethod
+    def load(cls, path: str, key: Dict[str, Any]) -> Optional['RecordCache']:
+        # Returns None, rather than raising, for a missing, damaged or non-matching cache.
+        try:
+            cache = cls(path)
+        except (OSError, ValueError):
+            return None
+        if not cache.matches(key):
+            cache.close()
+            return None
+        return cache
+
+    def matches(self, key: Dict[str, Any]) -> bool:
+        footer = self.footer
+        return (footer.get('version') == RECORD_CACHE_VERSION and footer.get('byteorder') == sys.byteorder
+                and footer.get('marshal_version') == marshal.version and footer.get('key') == key)
+
+    def __len__(self) -> int:
+        return self.footer['records']
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self.footer['stats']
+
+    @property
+    def dropped_digests(self) -> Dict[str, List[str]]:
+        return self.footer['dropped_digests']
+
+    def iter_blocks(self) -> Iterator[List[MftRecord]]:
+        for offset, count in self.footer['groups']:
+            yield self.read_group(offset, count)
+
+    def read_group(self, position: int, count: int) -> List[MftRecord]:
+        mapped = self.mapped
+
+        def take(typecode: str, length: int) -> list:
+            nonlocal position
+            size = array(typecode).itemsize * length
+            with memoryview(mapped)[position:position + size] as part, part.cast(typecode) as typed:
+                values = typed.tolist()
+            position += size + len(padding(size))
+            return values
+
+        def take_heap() -> Tuple[List[int], bytes]:
+            nonlocal position
+            offsets = take('Q', count + 1)
+            data = mapped[position:position + offsets[-1]]
+            position += offsets[-1] + len(padding(offsets[-1]))
+            return offsets, data
+
+        def take_strings() -> List[Optional[str]]:
+            nulls = take('B', count)
+            offsets, data = take_heap()
+            return [None if nulls[i] else data[offsets[i]:offsets[i + 1]].decode('utf-8', 'surrogatepass')
+                    for i in range(count)]
+
+        values: Dict[str, Any] = {}
+        for name, typecode in INT_COLUMNS:
+            values[name] = take(typecode, count)
+        for name in TIME_COLUMNS:
+            values[name] = list(zip(*(take('Q', count) for _ in range(4))))
+        masks = take('I', count)
+        for name in STRING_COLUMNS:
+            values[name] = take_strings()
+        filepaths = take_strings()
+        offsets, data = take_heap()
+        details = [marshal.loads(data[offsets[i]:offsets[i + 1]]) for i in range(count)]
+
+        mask_types = {}
+        attribute_types = []
+        for mask, detail in zip(masks, details):
+            if mask not in mask_types:
+                mask_types[mask] = mask_to_types(mask)
+            attribute_types.append(mask_types[mask] + detail[0])
+        values['attribute_types'] = attribute_types
+        for i, name in enumerate(DETAIL_COLUMNS, 1):
+            values[name] = [detail[i] for detail in details]
+
+        records = []
+        for row, filepath in zip(zip(*(values[name] for name in MftRecord.TUPLE_FIELDS)), filepaths):
+            record = MftRecord.from_tuple(row)
+            record.filepath = filepath
+            records.append(record)
+        return records
+
+    def close(self) -> None:
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+        self.file.close()
@@ -0,0 +1,149 @@
+import fnmatch
+import re
+import struct
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from .constants import *
+from .parent_index import HEADER, locate_attributes
+from .windows_time import FILETIME_EPOCH
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FILE_MAGIC = int.from_bytes(MFT_RECORD_MAGIC, BYTE_ORDER)
+FILETIMES = struct.Struct("<4Q")
+
+# Header flag conditions: name -> (flag, set or clear)
+FLAG_CONDITIONS = {
+    'in-use': (FILE_RECORD_IN_USE, True),
+    'deleted': (FILE_RECORD_IN_USE, False),
+    'dir': (FILE_RECORD_IS_DIRECTORY, True),
+    'file': (FILE_RECORD_IS_DIRECTORY, False),
+}
+# Timestamps in the order they are stored in $STANDARD_INFORMATION and $FILE_NAME
+TIME_FIELDS = ('crtime', 'mtime', 'ctime', 'atime')
+# Where the four timestamps start within each attribute's content
+TIME_SOURCES = {'si': 0, 'fn': 8}
+RELATIVE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+TIME_CONDITION = re.compile(r'^(si|fn)-(crtime|mtime|ctime|atime)(>=|<=|>|<)(.+)$')
+RELATIVE_TIME = re.compile(r'^(\d+)([smhdw])$')
+
+
+def parse_time(value: str, now: float) -> int:
+    # A FILETIME for "30d" (30 days before now) style values or an ISO date/time, UTC unless given.
+    match = RELATIVE_TIME.match(value)
+    if match:
+        dt = datetime.fromtimestamp(now, timezone.utc) - timedelta(seconds=int(match.group(1)) * RELATIVE_UNITS[match.group(2)])
+    else:
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid time '{value}' (use a date such as 2024-01-31 or an age such as 30d)")
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - FILETIME_EPOCH) // timedelta(microseconds=1) * 10
+
+
+# --filter conditions, all of which must hold, checked in stages on the raw record so a record
+# that fails early costs as little as possible and is never built into an MftRecord:
+#   1. header flags (in-use, deleted, dir, file), vectorized over a block's decoded headers
+#   2. the $FILE_NAME name (name=GLOB, ext=EXT[,EXT...])
+#   3. $STANDARD_INFORMATION / $FILE_NAME timestamps (si-mtime>30d, fn-crtime<2024-01-01, ...)
+# Any filter also drops records without a FILE signature. Relative times are taken from now,
+# which is fixed when the filter is built so a resumed run keeps the same window.
+class RecordFilter:
+    def __init__(self, expressions: Sequence[str], now: Optional[float] = None) -> None:
+        self.expressions = list(expressions)
+        self.now = time.time() if now is None else now
+        self.flag_mask = 0
+        self.flag_value = 0
+        self.name_patterns: List[re.Pattern] = []
+        self.extensions: List[set] = []
+        self.time_conditions: List[Tuple[str, int, str, int]] = []
+        for expression in self.expressions:
+            self.add(expression.strip())
+        self.check_names = bool(self.name_patterns or self.extensions)
+        self.check_si = any(source == 'si' for source, _, _, _ in self.time_conditions)
+        self.check_fn = self.check_names or any(source == 'fn' for source, _, _, _ in self.time_conditions)
+
+    def add(self, expression: str) -> None:
+        lowered = expression.lower()
+        if lowered in FLAG_CONDITIONS:
+            flag, wanted = FLAG_CONDITIONS[lowered]
+            if self.flag_mask & flag and bool(self.flag_value & flag) != wanted:
+                raise ValueError(f"Filter '{expression}' contradicts an earlier filter")
+            self.flag_mask |= flag
+            if wanted:
+                self.flag_value |= flag
+            return
+        if lowered.startswith('name='):
+            self.name_patterns.append(re.compile(fnmatch.translate(expression[5:]), re.IGNORECASE))
+            return
+        if lowered.startswith('ext='):
+            extensions = {ext.strip().lstrip('.').lower() for ext in expression[4:].split(',') if ext.strip()}
+            if not extensions:
+                raise ValueError(f"Filter '{expression}' names no extensions")
+            self.extensions.append(extensions)
+            return
+        match = TIME_CONDITION.match(lowered)
+        if match:
+            source, field, op, value = match.groups()
+            self.time_conditions.append((source, TIME_FIELDS.index(field), op, parse_time(expression[match.start(4):], self.now)))
+            return
+        raise ValueError(f"Invalid filter '{expression}' (use in-use, deleted, dir, file, name=GLOB, ext=EXT[,EXT...] "
+                         f"or si|fn-crtime|mtime|ctime|atime followed by >, >=, < or <= and a date or age such as 30d)")
+
+    # Stage 1 for a whole block: which records have a FILE signature and the wanted flags.
+    def header_mask(self, headers: Dict[str, Sequence[int]]) -> Sequence[bool]:
+        magic, flags = headers['magic'], headers['flags']
+        if np is not None and isinstance(flags, np.ndarray):
+            return (magic == FILE_MAGIC) & ((flags & self.flag_mask) == self.flag_value)
+        mask, value = self.flag_mask, self.flag_value
+        return [m == FILE_MAGIC and (f & mask) == value for m, f in zip(magic, flags)]
+
+    def header_matches(self, raw_record: Union[bytes, memoryview]) -> bool:
+        try:
+            magic, _, _, flags = HEADER.unpack_from(raw_record)
+        except struct.error:
+            return False
+        return magic == MFT_RECORD_MAGIC and (flags & self.flag_mask) == self.flag_value
+
+    # Stages 2 and 3, for a record whose header already passed.
+    def attributes_match(self, raw_record: Union[bytes, memoryview]) -> bool:
+        if not (self.check_fn or self.check_si):
+            return True
+        try:
+            si, fn = locate_attributes(raw_record)
+        except (struct.error, IndexError):
+            return False
+        if self.check_fn and fn is None:
+            return False
+
+        if self.check_names:
+            name_len = raw_record[fn + 64]
+            name = str(raw_record[fn + 66:fn + 66 + name_len * 2], 'utf-16-le', errors='replace')
+            if not all(pattern.match(name) for pattern in self.name_patterns):
+                return False
+            extension = name.rpartition('.')[2].lower() if '.' in name else ''
+            if not all(extension in extensions for extensions in self.extensions):
+                return False
+
+        if self.time_conditions:
+            if self.check_si and si is None:
+                return False
+            times = {
+                'si': FILETIMES.unpack_from(raw_record, si + TIME_SOURCES['si']) if si is not None else None,
+                'fn': FILETIMES.unpack_from(raw_record, fn + TIME_SOURCES['fn']) if fn is not None else None,
+            }
+            for source, index, op, cutoff in self.time_conditions:
+                value = times[source][index]
+                if not (value > cutoff if op == '>' else value >= cutoff if op == '>=' else
+                        value < cutoff if op == '<' else value <= cutoff):
+                    return False
+        return True
+
+    def matches(self, raw_record: Union[bytes, memoryview]) -> bool:
+        return self.header_matches(raw_record) and self.attributes_match(raw_record)
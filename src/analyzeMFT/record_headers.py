@@ -0,0 +1,76 @@
+import struct
+from typing import Dict, Optional, Sequence, Tuple, Union
+from .constants import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Header fields decoded for a whole block at once: (name, numpy type, offset)
+HEADER_COLUMNS = (
+    ('magic', '<u4', MFT_RECORD_MAGIC_NUMBER_OFFSET),
+    ('lsn', '<u8', MFT_RECORD_LOGFILE_SEQUENCE_NUMBER_OFFSET),
+    ('seq', '<u2', MFT_RECORD_SEQUENCE_NUMBER_OFFSET),
+    ('attr_off', '<u2', MFT_RECORD_FIRST_ATTRIBUTE_OFFSET),
+    ('flags', '<u2', MFT_RECORD_FLAGS_OFFSET),
+    ('size', '<u4', MFT_RECORD_USED_SIZE_OFFSET),
+    ('base_ref', '<u8', MFT_RECORD_FILE_REFERENCE_OFFSET),
+    ('recordnum', '<u4', MFT_RECORD_RECORD_NUMBER_OFFSET),
+)
+# The same fields for struct.iter_unpack, padded out to the record size
+HEADER_FORMAT = "<I4xQH2xHHI4xQ4xI"
+
+ALLOCATED_SIZE = struct.Struct("<I")
+
+
+def is_valid_record_size(size: int) -> bool:
+    return MIN_MFT_RECORD_SIZE <= size <= MAX_MFT_RECORD_SIZE and size & (size - 1) == 0
+
+# A record size given by the user, checked the same way as one read from a header.
+def check_record_size(size: int) -> int:
+    if not is_valid_record_size(size):
+        raise ValueError(f"invalid MFT record size {size}: must be a power of two between "
+                         f"{MIN_MFT_RECORD_SIZE} and {MAX_MFT_RECORD_SIZE} bytes")
+    return size
+
+# The allocated record size stored in a record header, if it is a plausible power of two.
+def record_size_from_header(header: Union[bytes, memoryview]) -> Optional[int]:
+    end = MFT_RECORD_ALLOCATED_SIZE_OFFSET + MFT_RECORD_ALLOCATED_SIZE_SIZE
+    if len(header) >= end and bytes(header[:len(MFT_RECORD_MAGIC)]) == MFT_RECORD_MAGIC:
+        size = ALLOCATED_SIZE.unpack_from(header, MFT_RECORD_ALLOCATED_SIZE_OFFSET)[0]
+        if is_valid_record_size(size):
+            return size
+    return None
+
+def header_dtype(record_size: int):
+    return np.dtype({
+        'names': [name for name, _, _ in HEADER_COLUMNS],
+        'formats': [fmt for _, fmt, _ in HEADER_COLUMNS],
+        'offsets': [offset for _, _, offset in HEADER_COLUMNS],
+        'itemsize': record_size,
+    })
+
+def decode_headers(block: Union[bytes, memoryview], record_size: int) -> Dict[str, Sequence[int]]:
+    count = len(block) // record_size
+    if np is not None:
+        headers = np.frombuffer(block, dtype=header_dtype(record_size), count=count)
+        # Copies, so no column keeps the read block (or the mmap behind it) alive.
+        return {name: headers[name].copy() for name, _, _ in HEADER_COLUMNS}
+
+    header = struct.Struct(f"{HEADER_FORMAT}{record_size - struct.calcsize(HEADER_FORMAT)}x")
+    rows = header.iter_unpack(memoryview(block)[:count * record_size])
+    columns = tuple(zip(*rows)) or ((),) * len(HEADER_COLUMNS)
+    return {name: column for (name, _, _), column in zip(HEADER_COLUMNS, columns)}
+
+def count_flags(flags: Sequence[int]) -> Tuple[int, int]:
+    if np is not None and isinstance(flags, np.ndarray):
+        return (int(np.count_nonzero(flags & FILE_RECORD_IN_USE)),
+                int(np.count_nonzero(flags & FILE_RECORD_IS_DIRECTORY)))
+    in_use = directories = 0
+    for value in flags:
+        if value & FILE_RECORD_IN_USE:
+            in_use += 1
+        if value & FILE_RECORD_IS_DIRECTORY:
+            directories += 1
+    return in_use, directories
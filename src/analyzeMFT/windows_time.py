@@ -1,26 +1,147 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Sequence
 
+from .constants import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FILETIME_EPOCH = datetime(1601, 1, 1, tzinfo=timezone.utc)
+UNIX_EPOCH_AS_FILETIME = 116444736000000000
+MAX_FILETIME = (datetime.max.replace(tzinfo=timezone.utc) - FILETIME_EPOCH) // timedelta(microseconds=1) * 10 + 9
+
+_UNSET = object()
+
+
+# Holds the raw 64-bit FILETIME (100ns ticks since 1601-01-01 UTC). The datetime, the
+# formatted string and the epoch seconds are only worked out when first read.
 class WindowsTime:
+    __slots__ = ('filetime', '_unixtime', '_dt', '_dtstr')
+
     def __init__(self, low: int, high: int) -> None:
-        self.low = int(low)
-        self.high = int(high)
-        
-        if (low == 0) and (high == 0):
-            self.dt = None
-            self.dtstr = "Not defined"
-            self.unixtime = 0
-            return
-        
-        self.unixtime = self.get_unix_time()
-        
-        try:
-            self.dt = datetime.fromtimestamp(self.unixtime, tz=timezone.utc)
-            self.dtstr = self.dt.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
-        except:
-            self.dt = None
-            self.dtstr = "Invalid timestamp"
-            self.unixtime = 0
+        self.filetime = int(high) * 2**32 + int(low)
+        self._unixtime = self._dt = self._dtstr = _UNSET
+
+    @classmethod
+    def from_filetime(cls, filetime: int) -> 'WindowsTime':
+        if filetime == 0:
+            return NOT_DEFINED
+        wt = cls.__new__(cls)
+        wt.filetime = filetime
+        wt._unixtime = wt._dt = wt._dtstr = _UNSET
+        return wt
+
+    @property
+    def low(self) -> int:
+        return self.filetime & 0xFFFFFFFF
+
+    @property
+    def high(self) -> int:
+        return self.filetime >> 32
+
+    @property
+    def is_valid(self) -> bool:
+        return 0 < self.filetime <= MAX_FILETIME
+
+    @property
+    def unixtime(self) -> float:
+        if self._unixtime is _UNSET:
+            self._unixtime = filetime_to_unixtime(self.filetime)
+        return self._unixtime
+
+    @property
+    def dt(self) -> datetime:
+        if self._dt is _UNSET:
+            if self.is_valid:
+                self._dt = FILETIME_EPOCH + timedelta(microseconds=self.filetime // 10)
+            else:
+                self._dt = None
+        return self._dt
+
+    @property
+    def dtstr(self) -> str:
+        if self._dtstr is _UNSET:
+            if self.filetime == 0:
+                self._dtstr = "Not defined"
+            elif self.dt is None:
+                self._dtstr = "Invalid timestamp"
+            else:
+                self._dtstr = self.dt.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+        return self._dtstr
 
     def get_unix_time(self) -> float:
-        t = float(self.high) * 2**32 + self.low
-        return (t / 10000000) - 11644473600 
\ No newline at end of file
+        return (self.filetime - UNIX_EPOCH_AS_FILETIME) / 10000000
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, WindowsTime) and self.filetime == other.filetime
+
+    def __hash__(self) -> int:
+        return hash(self.filetime)
+
+    def __repr__(self) -> str:
+        return f"WindowsTime({self.low}, {self.high})"
+
+
+# Shared placeholder for timestamps that are absent or zero. Its values are filled in up front
+# and it refuses any later assignment, since a change would show up in every record using it.
+class _UndefinedTime(WindowsTime):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        for name, value in (('filetime', 0), ('_unixtime', 0), ('_dt', None), ('_dtstr', "Not defined")):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("NOT_DEFINED is shared and cannot be modified")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("NOT_DEFINED is shared and cannot be modified")
+
+NOT_DEFINED = _UndefinedTime()
+
+
+def filetime_to_unixtime(filetime: int) -> float:
+    return (filetime - UNIX_EPOCH_AS_FILETIME) / 10000000 if 0 < filetime <= MAX_FILETIME else 0
+
+def format_filetimes(filetimes: Sequence[int]) -> List[str]:
+    if np is not None and len(filetimes) >= TIMESTAMP_NUMPY_MIN_BATCH:
+        return format_filetimes_numpy(filetimes)
+    return format_filetimes_python(filetimes)
+
+def format_filetimes_numpy(filetimes: Sequence[int]) -> List[str]:
+    ft = np.array(filetimes, dtype=np.uint64)
+    valid = (ft != 0) & (ft <= MAX_FILETIME)
+    ms = (ft[valid] // np.uint64(10000)).astype(np.int64) - UNIX_EPOCH_AS_FILETIME // 10000
+    text = np.char.add(np.datetime_as_string(ms.astype('datetime64[ms]'), unit='ms'), 'Z')
+    out = np.where(ft == 0, "Not defined", "Invalid timestamp").astype(object)
+    out[valid] = text
+    return out.tolist()
+
+def format_filetimes_python(filetimes: Sequence[int]) -> List[str]:
+    # SI and FN times of one record usually share the same second, so only the
+    # fractional part is formatted per value.
+    seconds_text = {}
+    out = []
+    for filetime in filetimes:
+        if filetime == 0:
+            out.append("Not defined")
+        elif not 0 < filetime <= MAX_FILETIME:
+            out.append("Invalid timestamp")
+        else:
+            seconds, ticks = divmod(filetime, 10000000)
+            text = seconds_text.get(seconds)
+            if text is None:
+                text = (FILETIME_EPOCH + timedelta(seconds=seconds)).isoformat()[:19]
+                seconds_text[seconds] = text
+            out.append(f"{text}.{ticks // 10000:03d}Z")
+    return out
+
+# Formats every not-yet-formatted timestamp in one batch and stores the strings,
+# so later dtstr reads are plain cache hits.
+def prime_times(times: Iterable[WindowsTime]) -> None:
+    pending = [wt for wt in times if wt._dtstr is _UNSET and 0 <= wt.filetime < 2**64]
+    if pending:
+        for wt, text in zip(pending, format_filetimes([wt.filetime for wt in pending])):
+            wt._dtstr = text
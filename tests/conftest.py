@@ -0,0 +1,48 @@
+import pytest
+import struct
+from src.analyzeMFT import mft_diff, record_filter, record_headers
+from src.analyzeMFT.constants import *
+
+# Synthetic MFT records for the tests. make_record builds a FILE record from the header
+# fields a test cares about and a list of attributes built with the helpers below.
+
+def make_attribute(attr_type, content):
+    attr_len = 24 + len(content) + (-len(content)) % 8
+    attribute = bytearray(attr_len)
+    struct.pack_into("<LLBBHHHLH", attribute, 0, attr_type, attr_len, 0, 0, 0, 0, 0, len(content), 24)
+    attribute[24:24 + len(content)] = content
+    return bytes(attribute)
+
+def make_standard_information(crtime=0, mtime=0, ctime=0, atime=0):
+    return make_attribute(STANDARD_INFORMATION_ATTRIBUTE, struct.pack("<4Q", crtime, mtime, ctime, atime) + b'\x00' * 16)
+
+def make_file_name(parent, name, parent_seq=1, namespace=1, crtime=0):
+    content = (struct.pack("<Q", parent | (parent_seq << 48)) + struct.pack("<4Q", crtime, 0, 0, 0) + b'\x00' * 24
+               + bytes([len(name), namespace]) + name.encode('utf-16-le'))
+    return make_attribute(FILE_NAME_ATTRIBUTE, content)
+
+def make_record(recordnum=0, attributes=(), seq=1, flags=FILE_RECORD_IN_USE, lsn=0, link=1,
+                used_size=None, base_ref=0, record_size=MFT_RECORD_SIZE):
+    record = bytearray(record_size)
+    record[0:4] = MFT_RECORD_MAGIC
+    offset = 56
+    for attribute in attributes:
+        record[offset:offset + len(attribute)] = attribute
+        offset += len(attribute)
+    struct.pack_into("<L", record, offset, 0xffffffff)
+    struct.pack_into("<Q", record, 8, lsn)
+    struct.pack_into("<HHHH", record, 16, seq, link, 56, flags)
+    struct.pack_into("<II", record, 24, offset + 8 if used_size is None else used_size, record_size)
+    struct.pack_into("<Q", record, 32, base_ref)
+    struct.pack_into("<I", record, 44, recordnum)
+    return record
+
+# Runs a test once with the numpy header decoding and once with the pure Python fallback.
+@pytest.fixture(params=["numpy", "python"])
+def decoder(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        for module in (record_headers, record_filter, mft_diff):
+            monkeypatch.setattr(module, "np", None)
+    return request.param
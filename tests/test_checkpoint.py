@@ -0,0 +1,92 @@
+import pytest
+import asyncio
+from src.analyzeMFT.checkpoint import CheckpointLog, load_checkpoint
+from src.analyzeMFT.file_writers import CsvWriter, JsonWriter
+from src.analyzeMFT.mft_analyzer import MftAnalyzer
+from src.analyzeMFT.mft_record import MftRecord
+from src.analyzeMFT.constants import *
+from . import conftest
+
+KEY = {'input_size': 4096, 'export_format': 'csv'}
+
+def make_record(recordnum):
+    record = MftRecord(b'\x00' * MFT_RECORD_SIZE)
+    record.recordnum = recordnum
+    record.filename = f"file{recordnum}.txt"
+    return record
+
+def test_checkpoint_log_ignores_torn_line(tmp_path):
+    path = tmp_path / "out.csv.checkpoint"
+    log = CheckpointLog(str(path), KEY)
+    log.open()
+    log.write({'records_read': 10}, {'md5': ['a', 'b']})
+    log.write({'records_read': 20}, {'md5': ['c']})
+    log.close()
+    complete = path.stat().st_size
+    with open(path, 'ab') as f:
+        f.write(b'{"state": {"records_read": 3')
+
+    state, digests, position = load_checkpoint(str(path), KEY)
+    assert state == {'records_read': 20}
+    assert digests == {'md5': {'a', 'b', 'c'}}
+    assert position == complete
+    assert load_checkpoint(str(path), dict(KEY, input_size=8192)) is None
+    assert load_checkpoint(str(tmp_path / "missing"), KEY) is None
+
+    log.open(position)
+    log.write({'records_read': 30}, {})
+    log.close()
+    assert load_checkpoint(str(path), KEY)[0] == {'records_read': 30}
+
+@pytest.mark.parametrize("writer_class", [CsvWriter, JsonWriter])
+def test_writer_resume_drops_output_after_checkpoint(tmp_path, writer_class):
+    blocks = [[make_record(0), make_record(1)], [make_record(2)], [make_record(3)]]
+    expected = tmp_path / "expected"
+    writer = writer_class(str(expected))
+    writer.open()
+    writer.write_block(blocks[0])
+    writer.write_block(blocks[2])
+    writer.close()
+
+    output = tmp_path / "output"
+    writer = writer_class(str(output))
+    writer.open()
+    writer.write_block(blocks[0])
+    state = writer.checkpoint()
+    writer.write_block(blocks[1])  # lost to the interruption
+    writer.close()
+
+    writer = writer_class(str(output))
+    writer.resume(state)
+    writer.write_block(blocks[2])
+    writer.close()
+    assert output.read_bytes() == expected.read_bytes()
+
+def test_analyzer_resumes_after_interrupt(tmp_path, monkeypatch):
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(conftest.make_record(i, flags=FILE_RECORD_IN_USE if i % 3 else 0) for i in range(3000)))
+
+    reference = MftAnalyzer(str(mft_path), str(tmp_path / "reference.csv"))
+    asyncio.run(reference.analyze())
+
+    output = tmp_path / "output.csv"
+    interrupted = MftAnalyzer(str(mft_path), str(output), checkpoint_interval=1000)
+    add_record = interrupted.add_record
+
+    async def interrupt_at_1500(record):
+        await add_record(record)
+        if interrupted.stats['total_records'] == 1500:
+            interrupted.interrupt_flag.set()
+
+    monkeypatch.setattr(interrupted, "add_record", interrupt_at_1500)
+    asyncio.run(interrupted.analyze())
+    assert interrupted.stats['total_records'] == 1500
+    assert (tmp_path / "output.csv.checkpoint").exists()
+
+    resumed = MftAnalyzer(str(mft_path), str(output), resume=True)
+    asyncio.run(resumed.analyze())
+
+    assert output.read_bytes() == (tmp_path / "reference.csv").read_bytes()
+    assert resumed.stats['total_records'] == 3000
+    assert resumed.stats['active_records'] == reference.stats['active_records'] == 2000
+    assert not (tmp_path / "output.csv.checkpoint").exists()
@@ -0,0 +1,23 @@
+import pytest
+import random
+from src.analyzeMFT.external_sort import ExternalSorter
+
+def test_sorts_in_memory_without_spilling():
+    sorter = ExternalSorter(memory_budget=1 << 20)
+    sorter.extend([(3, 'c'), (1, 'a')], 10)
+    sorter.extend([(2, 'b')], 5)
+    assert sorter.runs == []
+    assert list(sorter.merged()) == [(1, 'a'), (2, 'b'), (3, 'c')]
+    sorter.close()
+
+def test_spills_runs_and_merges(tmp_path):
+    items = [(random.randrange(1000), n, f"path{n}") for n in range(5000)]
+    sorter = ExternalSorter(memory_budget=1000, temp_dir=str(tmp_path), chunk_size=64)
+    for start in range(0, len(items), 250):
+        block = items[start:start + 250]
+        sorter.extend(block, len(block) * 10)
+
+    assert len(sorter.runs) == 20
+    assert list(sorter.merged()) == sorted(items)
+    sorter.close()
+    assert sorter.runs == []
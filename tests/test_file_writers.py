@@ -1,8 +1,14 @@
 import pytest
 import asyncio
+import csv
+import json
+import sqlite3
+import xml.etree.ElementTree as ET
 from unittest.mock import patch, mock_open
-from src.analyzeMFT.file_writers import FileWriters
+from src.analyzeMFT.file_writers import FileWriters, CsvWriter, JsonWriter, JsonLinesWriter, XmlWriter, SqliteWriter, ExcelWriter, L2tWriter, TimelineWriter, SortedTimelineWriter, WRITERS, json_default
 from src.analyzeMFT.mft_record import MftRecord
+from src.analyzeMFT.windows_time import WindowsTime
+from src.analyzeMFT.constants import CSV_HEADER
 
 @pytest.fixture
 def mock_records():
@@ -16,19 +22,205 @@ async def test_write_csv(mock_records):
         mock_file().write.assert_called()
 
 @pytest.mark.asyncio
-async def test_write_json(mock_records):
-    with patch('json.dump') as mock_json_dump:
-        await FileWriters.write_json(mock_records, 'output.json')
-        mock_json_dump.assert_called_once()
+async def test_write_json(tmp_path, mock_records):
+    output = tmp_path / "output.json"
+    await FileWriters.write_json(mock_records, str(output))
+    assert len(json.loads(output.read_text(encoding='utf-8'))) == len(mock_records)
 
 @pytest.mark.asyncio
-async def test_write_xml(mock_records):
-    with patch('xml.etree.ElementTree.ElementTree.write') as mock_xml_write:
-        await FileWriters.write_xml(mock_records, 'output.xml')
-        mock_xml_write.assert_called_once()
+async def test_write_xml(tmp_path, mock_records):
+    output = tmp_path / "output.xml"
+    await FileWriters.write_xml(mock_records, str(output))
+    root = ET.parse(str(output)).getroot()
+    assert root.tag == "mft_records"
+    assert len(root.findall("record")) == len(mock_records)
 
 @pytest.mark.asyncio
 async def test_write_excel(mock_records):
     with patch('openpyxl.Workbook') as mock_workbook:
         await FileWriters.write_excel(mock_records, 'output.xlsx')
-        mock_workbook.return_value.save.assert_called_once_with('output.xlsx')
\ No newline at end of file
+        mock_workbook.return_value.save.assert_called_once_with('output.xlsx')
+
+def test_json_writer_matches_json_dump(tmp_path, mock_records):
+    output = tmp_path / "output.json"
+    mock_records[0].filename = "caf\u00e9.txt"
+    mock_records[1].bitmap = {'size': 2, 'data': b'\xff\x01'}
+    writer = JsonWriter(str(output))
+    writer.open()
+    writer.write_block(mock_records[:2])
+    writer.write_block([])
+    writer.write_block(mock_records[2:])
+    writer.close()
+
+    expected = json.dumps([record.to_dict() for record in mock_records], indent=2, default=json_default)
+    assert output.read_text(encoding='utf-8') == expected
+    assert json.loads(expected)[1]['bitmap'] == {'size': 2, 'data': 'ff01'}
+
+    empty = tmp_path / "empty.json"
+    writer = JsonWriter(str(empty))
+    writer.open()
+    writer.close()
+    assert json.loads(empty.read_text(encoding='utf-8')) == []
+
+@pytest.mark.parametrize("export_format", sorted(WRITERS))
+def test_writers_share_block_interface(tmp_path, mock_records, export_format):
+    if export_format == "excel":
+        pytest.importorskip("openpyxl")
+    writer = WRITERS[export_format](str(tmp_path / f"output.{export_format}"))
+    writer.open()
+    writer.write_block(mock_records[:2])
+    writer.write_block(mock_records[2:])
+    writer.close()
+    assert (tmp_path / f"output.{export_format}").stat().st_size > 0
+
+def test_json_lines_writer(tmp_path, mock_records):
+    output = tmp_path / "output.jsonl"
+    mock_records[0].filepath = "\\Windows\\notepad.exe"
+    mock_records[1].bitmap = {'size': 2, 'data': b'\xff\x01'}
+    writer = JsonLinesWriter(str(output))
+    writer.open()
+    writer.write_block(mock_records[:2])
+    writer.write_block(mock_records[2:])
+    writer.close()
+
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == len(mock_records)
+    first = json.loads(lines[0])
+    assert list(first) == list(MftRecord.DICT_FIELDS)
+    assert first['filepath'] == "\\Windows\\notepad.exe"
+    assert json.loads(lines[1])['bitmap'] == {'size': 2, 'data': 'ff01'}
+
+@pytest.mark.parametrize("hash_algorithms, extra", [([], []), (['md5', 'crc32'], []), (['sha256', 'blake2b'], ['BLAKE2b'])])
+def test_csv_writer_hash_columns(tmp_path, mock_records, hash_algorithms, extra):
+    output = tmp_path / "output.csv"
+    mock_records[0].apply_hashes({name: f"{name}-digest" for name in hash_algorithms})
+    writer = CsvWriter(str(output), hash_algorithms=hash_algorithms)
+    writer.open()
+    writer.write_block(mock_records)
+    writer.close()
+
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert len(CSV_HEADER) == 50
+    assert rows[0] == CSV_HEADER + extra
+    assert all(len(row) == len(rows[0]) for row in rows)
+    if 'blake2b' in hash_algorithms:
+        assert rows[1][-1] == "blake2b-digest"
+        assert rows[1][CSV_HEADER.index('SHA256')] == "sha256-digest"
+
+def test_xml_writer_streams_blocks(tmp_path, mock_records):
+    output = tmp_path / "output.xml"
+    mock_records[0].filename = "a<b>&c.txt"
+    writer = XmlWriter(str(output), flush_interval=2)
+    writer.open()
+    writer.write_block(mock_records[:3])
+    assert output.read_text(encoding='utf-8').count("<record>") == 2  # flushed after two records
+    writer.write_block(mock_records[3:])
+    writer.close()
+
+    records = ET.parse(str(output)).getroot().findall("record")
+    assert len(records) == len(mock_records)
+    assert records[0].find("filename").text == "a<b>&c.txt"
+    assert records[0].find("object_id").text is None
+    assert [child.tag for child in records[0]] == list(MftRecord.DICT_FIELDS)
+
+def test_sqlite_writer_bulk_load(tmp_path):
+    output = tmp_path / "output.db"
+    output.write_text("stale output")
+    records = [MftRecord(b'\x00' * 1024) for _ in range(5)]
+    for number, record in enumerate(records):
+        record.recordnum = number
+        record.filepath = f"\\file{number}.txt"
+    writer = SqliteWriter(str(output), transaction_size=2)
+    writer.open()
+    writer.write_block(records[:3])
+    writer.write_block(records[3:])
+    writer.close()
+
+    conn = sqlite3.connect(str(output))
+    assert conn.execute("SELECT COUNT(*) FROM mft_records").fetchone() == (5,)
+    assert conn.execute("SELECT filepath FROM mft_records WHERE record_number = 4").fetchone() == ("\\file4.txt",)
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_mft_records_number", "idx_mft_records_parent", "idx_mft_records_filename"} <= indexes
+    assert conn.execute("SELECT COUNT(*) FROM attribute_types").fetchone()[0] > 0
+    conn.close()
+
+def test_sqlite_writer_keeps_repeated_record_numbers(tmp_path, mock_records):
+    output = tmp_path / "output.db"
+    writer = SqliteWriter(str(output))
+    writer.open()
+    writer.write_block(mock_records)
+    writer.close()
+
+    conn = sqlite3.connect(str(output))
+    assert conn.execute("SELECT COUNT(*) FROM mft_records WHERE record_number = 0").fetchone() == (len(mock_records),)
+    conn.close()
+
+def test_excel_writer_rolls_over_sheets(tmp_path, mock_records):
+    openpyxl = pytest.importorskip("openpyxl")
+    output = tmp_path / "output.xlsx"
+    mock_records[0].filename = "bad\x01name.txt"
+    writer = ExcelWriter(str(output), max_rows=3)
+    writer.open()
+    writer.write_block(mock_records[:3])
+    writer.write_block(mock_records[3:])
+    writer.close()
+
+    workbook = openpyxl.load_workbook(str(output), read_only=True)
+    assert workbook.sheetnames == ["MFT Records", "MFT Records 2", "MFT Records 3"]
+    sheets = [list(sheet.iter_rows(values_only=True)) for sheet in workbook.worksheets]
+    assert [len(rows) for rows in sheets] == [3, 3, 2]
+    assert all(rows[0] == tuple(CSV_HEADER) for rows in sheets)
+    assert sheets[0][1][CSV_HEADER.index('Filename')] == "badname.txt"
+
+def test_timeline_writers_use_full_paths(tmp_path, mock_records):
+    mock_records[0].filename = "notepad.exe"
+    mock_records[0].filepath = "\\Windows\\notepad.exe"
+    mock_records[1].filename = "orphan.txt"
+    for export_format in ("body", "timeline", "l2t"):
+        output = tmp_path / f"output.{export_format}"
+        writer = WRITERS[export_format](str(output))
+        writer.open()
+        writer.write_block(mock_records[:2])
+        writer.close()
+        text = output.read_text(encoding='utf-8')
+        assert "\\Windows\\notepad.exe" in text
+        assert "orphan.txt" in text
+
+def test_l2t_writer_caches_time_text(tmp_path, mock_records):
+    base = 133444736000000000  # 2023-11-14 22:13:20 UTC; the second record is 0.12s later
+    mock_records[0].fn_times = {key: WindowsTime.from_filetime(base) for key in MftRecord.TIME_KEYS}
+    mock_records[1].fn_times = {key: WindowsTime.from_filetime(base + 1234567) for key in MftRecord.TIME_KEYS}
+    output = tmp_path / "output.l2t"
+    writer = L2tWriter(str(output))
+    writer.open()
+    writer.write_block(mock_records[:3])
+    writer.close()
+
+    rows = list(csv.reader(output.read_text(encoding='utf-8').splitlines()))
+    assert rows[0] == L2tWriter.HEADER
+    assert [row[3] for row in rows[1:5]] == ['B', 'M', 'C', 'A']
+    assert {tuple(row[:2]) for row in rows[1:9]} == {('11/14/2023', '22:13:20')}
+    assert rows[9][:2] == ['', '']  # no $FILE_NAME timestamps
+    assert writer.time_text.misses == 1
+
+def test_sorted_timeline_writer(tmp_path):
+    records = []
+    for number, base in enumerate([133444736000000000, 133000000000000000, 133200000000000000]):
+        record = MftRecord(b'\x00' * 1024)
+        record.recordnum = number
+        record.filepath = f"\\file{number}.txt"
+        record.fn_times = {key: WindowsTime.from_filetime(base + i) for i, key in enumerate(MftRecord.TIME_KEYS)}
+        records.append(record)
+    output = tmp_path / "output.timeline"
+    writer = SortedTimelineWriter(TimelineWriter(str(output)), memory_budget=1, temp_dir=str(tmp_path))
+    writer.open()
+    writer.write_block(records[:2])
+    writer.write_block(records[2:])
+    assert len(writer.sorter.runs) == 2
+    writer.close()
+
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert [line.split('|')[8] for line in lines[::4]] == ['1', '2', '0']
+    assert [float(line.split('|')[0]) for line in lines] == sorted(float(line.split('|')[0]) for line in lines)
+    assert [path.name for path in tmp_path.iterdir()] == ["output.timeline"]
@@ -0,0 +1,78 @@
+import pytest
+import asyncio
+import hashlib
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from src.analyzeMFT import mft_analyzer
+from src.analyzeMFT.hashing import RecordHasher, hash_record, hash_records, parse_hash_algorithms
+from src.analyzeMFT.mft_analyzer import MftAnalyzer
+from src.analyzeMFT.mft_record import MftRecord
+from src.analyzeMFT.constants import MFT_RECORD_SIZE, DEFAULT_HASH_ALGORITHMS
+
+@pytest.fixture
+def raw_records():
+    return [bytes([i]) * MFT_RECORD_SIZE for i in range(3)]
+
+def test_hash_record_default_algorithms(raw_records):
+    hashes = hash_record(raw_records[0])
+
+    assert list(hashes) == DEFAULT_HASH_ALGORITHMS
+    assert hashes['md5'] == hashlib.md5(raw_records[0]).hexdigest()
+    assert hashes['sha256'] == hashlib.sha256(raw_records[0]).hexdigest()
+    assert hashes['sha512'] == hashlib.sha512(raw_records[0]).hexdigest()
+    assert hashes['crc32'] == format(zlib.crc32(raw_records[0]), '08x')
+
+def test_hash_record_subset(raw_records):
+    hashes = hash_record(memoryview(raw_records[0]), ['blake2b'])
+
+    assert hashes == {'blake2b': hashlib.blake2b(raw_records[0]).hexdigest()}
+
+def test_hash_records_splits_batch(raw_records):
+    hashes = hash_records(b''.join(raw_records), MFT_RECORD_SIZE, ['sha256'])
+
+    assert [h['sha256'] for h in hashes] == [hashlib.sha256(raw).hexdigest() for raw in raw_records]
+
+def test_parse_hash_algorithms():
+    assert parse_hash_algorithms("SHA256, md5") == ['md5', 'sha256']
+    assert parse_hash_algorithms("blake2b") == ['blake2b']
+
+def test_parse_hash_algorithms_rejects_unknown():
+    with pytest.raises(ValueError):
+        parse_hash_algorithms("sha256,sha1")
+
+@pytest.mark.asyncio
+async def test_record_hasher_applies_hashes(raw_records):
+    records = [MftRecord(raw) for raw in raw_records]
+    with ThreadPoolExecutor() as executor:
+        hasher = RecordHasher(executor, ['sha256'], MFT_RECORD_SIZE, batch_size=2)
+        for record, raw in zip(records, raw_records):
+            hasher.add(record, raw)
+        hashed = await hasher.drain()
+
+    assert len(hashed) == 3
+    for record, raw in zip(records, raw_records):
+        assert record.sha256 == hashlib.sha256(raw).hexdigest()
+        assert record.md5 is None
+
+def test_analyzer_hashes_inline_with_one_worker(tmp_path, monkeypatch):
+    raw_records = []
+    for i in range(3):
+        record = bytearray([i + 1]) * MFT_RECORD_SIZE
+        record[0:4] = b'FILE'
+        record[20:22] = (MFT_RECORD_SIZE - 8).to_bytes(2, 'little')
+        record[44:48] = i.to_bytes(4, 'little')
+        raw_records.append(bytes(record))
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(raw_records))
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a single worker should hash inline")
+
+    monkeypatch.setattr(mft_analyzer, "ProcessPoolExecutor", no_pool)
+    analyzer = MftAnalyzer(str(mft_path), str(tmp_path / "output.csv"), hash_algorithms=['md5'], block_size=2)
+    written = []
+    monkeypatch.setattr(analyzer, "prepare_block", lambda: written.extend(analyzer.mft_records.values()))
+    asyncio.run(analyzer.analyze())
+
+    assert [record.md5 for record in written] == [hashlib.md5(raw).hexdigest() for raw in raw_records]
+    assert analyzer.stats['unique_md5'] == {hashlib.md5(raw).hexdigest() for raw in raw_records}
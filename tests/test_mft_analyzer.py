@@ -1,10 +1,15 @@
 import pytest
 import asyncio
+import json
+import os
 from unittest.mock import patch, MagicMock, mock_open
 from io import StringIO
-from src.analyzeMFT.mft_analyzer import MftAnalyzer
+from src.analyzeMFT.mft_analyzer import MftAnalyzer, parse_record_range, parse_record_selection
+from src.analyzeMFT.file_writers import WRITERS
 from src.analyzeMFT.mft_record import MftRecord
-from src.analyzeMFT.constants import MFT_RECORD_SIZE
+from src.analyzeMFT.windows_time import WindowsTime, _UNSET
+from src.analyzeMFT.constants import MFT_RECORD_SIZE, FILE_RECORD_IN_USE, FILE_RECORD_IS_DIRECTORY
+from .conftest import make_record, make_file_name
 
 @pytest.fixture
 def mock_mft_file():
@@ -26,10 +31,10 @@ def analyzer():
 async def test_analyze(analyzer, mock_mft_file, mock_mft_record):
     with patch("builtins.open", mock_open(read_data=mock_mft_file)):
         with patch("src.analyzeMFT.mft_analyzer.MftRecord", return_value=mock_mft_record):
-            with patch("src.analyzeMFT.mft_analyzer.FileWriters") as mock_file_writers:
+            with patch.dict(WRITERS, {"csv": MagicMock()}) as writers:
                 await analyzer.analyze()
                 
-                mock_file_writers.write_csv.assert_called_once()
+                writers["csv"].return_value.write_block.assert_called_once()
                 assert len(analyzer.mft_records) == 1
                 assert analyzer.stats['total_records'] == 1
                 assert analyzer.stats['active_records'] == 1
@@ -42,10 +47,11 @@ async def test_analyze_with_different_export_formats(export_format, mock_mft_fil
     
     with patch("builtins.open", mock_open(read_data=mock_mft_file)):
         with patch("src.analyzeMFT.mft_analyzer.MftRecord", return_value=mock_mft_record):
-            with patch("src.analyzeMFT.mft_analyzer.FileWriters") as mock_file_writers:
+            with patch.dict(WRITERS, {export_format: MagicMock()}) as writers:
                 await analyzer.analyze()
                 
-                getattr(mock_file_writers, f"write_{export_format}").assert_called_once()
+                writers[export_format].return_value.write_block.assert_called_once()
+                writers[export_format].return_value.close.assert_called_once()
 
 @pytest.mark.asyncio
 async def test_analyze_with_compute_hashes(mock_mft_file, mock_mft_record):
@@ -53,7 +59,7 @@ async def test_analyze_with_compute_hashes(mock_mft_file, mock_mft_record):
     
     with patch("builtins.open", mock_open(read_data=mock_mft_file)):
         with patch("src.analyzeMFT.mft_analyzer.MftRecord", return_value=mock_mft_record):
-            with patch("src.analyzeMFT.mft_analyzer.FileWriters"):
+            with patch.dict(WRITERS, {"csv": MagicMock()}):
                 await analyzer.analyze()
                 
                 assert 'unique_md5' in analyzer.stats
@@ -67,7 +73,7 @@ async def test_analyze_with_debug(capsys, mock_mft_file, mock_mft_record):
     
     with patch("builtins.open", mock_open(read_data=mock_mft_file)):
         with patch("src.analyzeMFT.mft_analyzer.MftRecord", return_value=mock_mft_record):
-            with patch("src.analyzeMFT.mft_analyzer.FileWriters"):
+            with patch.dict(WRITERS, {"csv": MagicMock()}):
                 await analyzer.analyze()
                 
                 captured = capsys.readouterr()
@@ -79,7 +85,7 @@ async def test_analyze_with_invalid_record(analyzer, mock_mft_file):
     
     with patch("builtins.open", mock_open(read_data=invalid_record)):
         with patch("src.analyzeMFT.mft_analyzer.MftRecord", side_effect=Exception("Invalid record")):
-            with patch("src.analyzeMFT.mft_analyzer.FileWriters"):
+            with patch.dict(WRITERS, {"csv": MagicMock()}):
                 await analyzer.analyze()
                 
                 assert analyzer.stats['total_records'] == 1
@@ -89,7 +95,7 @@ async def test_analyze_with_invalid_record(analyzer, mock_mft_file):
 async def test_analyze_with_interrupt(analyzer, mock_mft_file, mock_mft_record):
     with patch("builtins.open", mock_open(read_data=mock_mft_file * 2)):
         with patch("src.analyzeMFT.mft_analyzer.MftRecord", return_value=mock_mft_record):
-            with patch("src.analyzeMFT.mft_analyzer.FileWriters"):
+            with patch.dict(WRITERS, {"csv": MagicMock()}):
                 def interrupt_analysis():
                     analyzer.interrupt_flag.set()
                 
@@ -152,13 +158,13 @@ async def test_print_statistics(analyzer, capsys):
 
 
 @pytest.mark.asyncio
-async def test_write_csv_block(analyzer, mock_mft_record):
+async def test_write_remaining_records(analyzer, mock_mft_record):
     analyzer.mft_records = {i: mock_mft_record for i in range(1000)}
-    analyzer.csv_writer = MagicMock()
+    analyzer.writer = MagicMock()
     
-    await analyzer.write_csv_block()
+    await analyzer.write_remaining_records()
     
-    assert analyzer.csv_writer.writerow.call_count == 1000
+    assert len(analyzer.writer.write_block.call_args[0][0]) == 1000
     assert len(analyzer.mft_records) == 0
 
 @pytest.mark.asyncio
@@ -166,7 +172,7 @@ async def test_analyze_large_number_of_records(analyzer, mock_mft_file, mock_mft
     large_mft_file = mock_mft_file * 10000
     with patch("builtins.open", mock_open(read_data=large_mft_file)):
         with patch("src.analyzeMFT.mft_analyzer.MftRecord", return_value=mock_mft_record):
-            with patch("src.analyzeMFT.mft_analyzer.FileWriters"):
+            with patch.dict(WRITERS, {"csv": MagicMock()}):
                 await analyzer.analyze()
                 
                 assert analyzer.stats['total_records'] == 10000
@@ -183,8 +189,262 @@ async def test_analyze_with_all_flags(mock_mft_file, mock_mft_record):
     
     with patch("builtins.open", mock_open(read_data=mock_mft_file)):
         with patch("src.analyzeMFT.mft_analyzer.MftRecord", return_value=mock_mft_record):
-            with patch("src.analyzeMFT.mft_analyzer.FileWriters") as mock_file_writers:
+            with patch.dict(WRITERS, {"json": MagicMock()}) as writers:
                 await analyzer.analyze()
                 
-                mock_file_writers.write_json.assert_called_once()
-                assert 'unique_md5' in analyzer.stats
\ No newline at end of file
+                writers["json"].return_value.write_block.assert_called_once()
+                assert 'unique_md5' in analyzer.stats
+
+def test_iter_records_mmap(analyzer, tmp_path):
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(bytes([i]) * MFT_RECORD_SIZE for i in range(3)))
+
+    with open(mft_path, 'rb') as f:
+        records = [bytes(raw) for raw in analyzer.iter_records(f)]
+
+    assert analyzer.read_mode == "mmap"
+    assert records == [bytes([i]) * MFT_RECORD_SIZE for i in range(3)]
+
+def test_iter_records_buffered_fallback(analyzer):
+    non_seekable = MagicMock()
+    non_seekable.seekable.return_value = False
+    non_seekable.read.side_effect = [b'FILE' * 256, b'']
+
+    records = list(analyzer.iter_records(non_seekable))
+
+    assert analyzer.read_mode == "buffered"
+    assert records == [b'FILE' * 256]
+
+def test_iter_records_prefetch(tmp_path):
+    analyzer = MftAnalyzer("test.mft", "output.csv", debug=False, compute_hashes=False, export_format="csv", reader="prefetch")
+    analyzer.prefetch_block_size = 2 * MFT_RECORD_SIZE
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(bytes([i]) * MFT_RECORD_SIZE for i in range(5)))
+
+    with open(mft_path, 'rb') as f:
+        records = [bytes(raw) for raw in analyzer.iter_records(f)]
+
+    assert analyzer.read_mode == "prefetch"
+    assert records == [bytes([i]) * MFT_RECORD_SIZE for i in range(5)]
+
+def test_iter_records_prefetch_stops_early(tmp_path):
+    analyzer = MftAnalyzer("test.mft", "output.csv", debug=False, compute_hashes=False, export_format="csv", reader="prefetch")
+    analyzer.prefetch_block_size = MFT_RECORD_SIZE
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b'\x00' * MFT_RECORD_SIZE * 10)
+
+    with open(mft_path, 'rb') as f:
+        records = analyzer.iter_records(f)
+        next(records)
+        records.close()
+
+    assert analyzer.read_mode == "prefetch"
+
+def test_iter_records_prefetch_reader_error(tmp_path, monkeypatch):
+    analyzer = MftAnalyzer("test.mft", "output.csv", debug=False, compute_hashes=False, export_format="csv", reader="prefetch")
+    analyzer.prefetch_block_size = MFT_RECORD_SIZE
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b'\x00' * MFT_RECORD_SIZE * 10)
+    pread = os.pread
+    reads = []
+
+    def failing_pread(fd, size, offset):
+        reads.append(offset)
+        if len(reads) > 2:
+            raise ValueError("bad read")
+        return pread(fd, size, offset)
+
+    monkeypatch.setattr(os, "pread", failing_pread)
+    with open(mft_path, 'rb') as f:
+        with pytest.raises(ValueError):
+            list(analyzer.iter_records(f))
+
+def test_detect_record_size(analyzer):
+    assert analyzer.detect_record_size(make_record(record_size=4096)) == 4096
+    assert analyzer.detect_record_size(make_record(record_size=1024)) == 1024
+
+def test_detect_record_size_falls_back_to_default(analyzer):
+    assert analyzer.detect_record_size(make_record(record_size=1000)) == MFT_RECORD_SIZE
+    assert analyzer.detect_record_size(b'\x00' * MFT_RECORD_SIZE) == MFT_RECORD_SIZE
+
+@pytest.mark.parametrize("record_size", [128, 1000, 3072, 131072])
+def test_invalid_record_size(record_size):
+    with pytest.raises(ValueError):
+        MftAnalyzer("test.mft", "output.csv", record_size=record_size)
+
+@pytest.mark.parametrize("reader", ["mmap", "prefetch", "buffered"])
+def test_iter_records_4k_records(reader, tmp_path):
+    analyzer = MftAnalyzer("test.mft", "output.csv", debug=False, compute_hashes=False, export_format="csv", reader=reader)
+    mft_path = tmp_path / "test.mft"
+    records = [make_record(i, record_size=4096) for i in range(3)]
+    mft_path.write_bytes(b''.join(records))
+
+    with open(mft_path, 'rb') as f:
+        parsed = [bytes(raw) for raw in analyzer.iter_records(f)]
+
+    assert analyzer.record_size == 4096
+    assert parsed == [bytes(record) for record in records]
+
+def test_parse_record_range(tmp_path):
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(make_record(i) for i in range(4)))
+
+    parsed, errors, header_flags, flags = parse_record_range(str(mft_path), MFT_RECORD_SIZE, 1, 3)
+
+    assert errors == []
+    assert [MftRecord.from_tuple(values).recordnum for values in parsed] == [1, 2]
+    assert list(header_flags) == [FILE_RECORD_IN_USE] * 2
+    assert flags == []
+
+def test_parse_record_range_counts_records_that_fail(tmp_path, monkeypatch):
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(make_named_record(i, 5, f"file{i}.txt") for i in range(4)))
+    parse_attributes = MftRecord.parse_attributes
+
+    def failing_parse_attributes(self, attributes=None):
+        if self.recordnum == 2:
+            raise ValueError("bad attribute")
+        parse_attributes(self, attributes)
+
+    monkeypatch.setattr(MftRecord, "parse_attributes", failing_parse_attributes)
+    parsed, errors, header_flags, flags = parse_record_range(str(mft_path), MFT_RECORD_SIZE, 0, 4)
+
+    assert [index for index, _ in errors] == [2]
+    assert len(parsed) == 3
+    assert list(header_flags) == [FILE_RECORD_IN_USE] * 4
+
+@pytest.mark.asyncio
+async def test_process_mft_with_workers(tmp_path):
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(make_record(i) for i in range(10)))
+    analyzer = MftAnalyzer(str(mft_path), str(tmp_path / "output.csv"), compute_hashes=False, export_format="csv", workers=2)
+
+    await analyzer.process_mft()
+
+    assert analyzer.stats['total_records'] == 10
+    assert list(analyzer.mft_records) == list(range(10))
+
+@pytest.mark.parametrize("export_format", ["csv", "json", "body", "timeline", "l2t", "tsk"])
+def test_every_block_reaches_the_output(tmp_path, export_format):
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(make_record(i) for i in range(10)))
+    output = tmp_path / f"output.{export_format}"
+    analyzer = MftAnalyzer(str(mft_path), str(output), export_format=export_format, block_size=3)
+
+    asyncio.run(analyzer.analyze())
+
+    if export_format == "json":
+        assert [record['recordnum'] for record in json.loads(output.read_text())] == list(range(10))
+    else:
+        lines = output.read_text().splitlines()
+        per_record = 4 if export_format in ("timeline", "l2t") else 1
+        header = 0 if export_format in ("body", "timeline", "tsk") else 1
+        assert len(lines) == header + 10 * per_record
+
+@pytest.mark.parametrize("export_format, formatted", [("csv", True), ("body", False), ("l2t", False)])
+def test_prepare_block_formats_times_only_when_needed(tmp_path, export_format, formatted):
+    analyzer = MftAnalyzer("test.mft", str(tmp_path / "output"), export_format=export_format)
+    record = MftRecord(make_record())
+    record.fn_times = {key: WindowsTime.from_filetime(133000000000000000) for key in MftRecord.TIME_KEYS}
+    analyzer.mft_records[0] = record
+
+    analyzer.prepare_block()
+
+    assert (record.fn_times['mtime']._dtstr is not _UNSET) == formatted
+
+def make_named_record(recordnum, parent, name, flags=FILE_RECORD_IN_USE):
+    return make_record(recordnum, [make_file_name(parent, name)], flags=flags)
+
+def write_named_mft(path):
+    # 5 is the root and 6 a directory; everything else is a file, half of them in the directory.
+    records = [make_named_record(i, 5 if i % 2 else 6, f"file{i}.txt") for i in range(12)]
+    records[5] = make_named_record(5, 5, ".")
+    records[6] = make_named_record(6, 5, "docs")
+    path.write_bytes(b''.join(records))
+
+@pytest.mark.parametrize("filters", [None, ["in-use"]])
+def test_parallel_matches_sequential(tmp_path, monkeypatch, filters):
+    parse_attributes = MftRecord.parse_attributes
+
+    def failing_parse_attributes(self, attributes=None):
+        if self.recordnum == 7:
+            raise ValueError("bad attribute")
+        parse_attributes(self, attributes)
+
+    # Forked workers inherit the patch, so record 7 fails in both modes.
+    monkeypatch.setattr(MftRecord, "parse_attributes", failing_parse_attributes)
+    records = [make_named_record(i, 5 if i % 2 else 6, f"file{i}.txt") for i in range(20)]
+    records[5] = make_named_record(5, 5, ".")
+    records[6] = make_named_record(6, 5, "docs", FILE_RECORD_IN_USE | FILE_RECORD_IS_DIRECTORY)
+    records[9] = make_named_record(9, 5, "file9.txt", 0)
+    records[12] = bytearray(MFT_RECORD_SIZE)
+    mft_path = tmp_path / "test.mft"
+    # Ends in a short record, as a truncated image would.
+    mft_path.write_bytes(b''.join(records) + make_named_record(20, 5, "tail.txt")[:MFT_RECORD_SIZE // 2])
+
+    results = []
+    for workers in (1, 2):
+        output = tmp_path / f"output{workers}.csv"
+        analyzer = MftAnalyzer(str(mft_path), str(output), compute_hashes=True, workers=workers, filters=filters)
+        asyncio.run(analyzer.analyze())
+        stats = dict(analyzer.stats)
+        del stats['processing_time']
+        results.append((output.read_bytes(), stats))
+
+    assert results[0] == results[1]
+    assert results[0][1]['total_records'] == (20 if filters is None else 18)
+
+def test_parse_record_selection():
+    assert parse_record_selection("1000-2000,5") == [range(5, 6), range(1000, 2001)]
+    assert parse_record_selection("3-6, 5-9,10") == [range(3, 11)]
+    for text in ("5-3", "a", "-1", ",", "1-x"):
+        with pytest.raises(ValueError):
+            parse_record_selection(text)
+
+def test_get_record(tmp_path):
+    mft_path = tmp_path / "test.mft"
+    write_named_mft(mft_path)
+    analyzer = MftAnalyzer(str(mft_path), str(tmp_path / "output.csv"))
+    try:
+        record = analyzer.get_record(8)
+        assert record.recordnum == 8
+        assert record.filepath == "\\docs\\file8.txt"
+        assert analyzer.get_record(8) is record
+        assert analyzer.get_record(12) is None
+        assert [record.recordnum for record in analyzer.get_records(range(2, 5))] == [2, 3, 4]
+    finally:
+        analyzer.close_records()
+
+def test_selected_records_match_full_run(tmp_path):
+    mft_path = tmp_path / "test.mft"
+    write_named_mft(mft_path)
+    full = MftAnalyzer(str(mft_path), str(tmp_path / "full.csv"))
+    asyncio.run(full.analyze())
+    selected = MftAnalyzer(str(mft_path), str(tmp_path / "selected.csv"),
+                           records=parse_record_selection("8-20,1,2-3"))
+    asyncio.run(selected.analyze())
+
+    full_lines = (tmp_path / "full.csv").read_text().splitlines()
+    selected_lines = (tmp_path / "selected.csv").read_text().splitlines()
+    assert selected_lines == [full_lines[0]] + [full_lines[1 + n] for n in (1, 2, 3, 8, 9, 10, 11)]
+    assert selected.stats['total_records'] == 7
+    assert selected.read_mode == "random access"
+
+def test_selected_records_read_once_with_filter(tmp_path, monkeypatch):
+    mft_path = tmp_path / "test.mft"
+    write_named_mft(mft_path)
+    read_raw_record = MftAnalyzer.read_raw_record
+    reads = []
+
+    def counting_read_raw_record(self, recordnum):
+        reads.append(recordnum)
+        return read_raw_record(self, recordnum)
+
+    monkeypatch.setattr(MftAnalyzer, "read_raw_record", counting_read_raw_record)
+    analyzer = MftAnalyzer(str(mft_path), str(tmp_path / "output.csv"),
+                           records=parse_record_selection("1-4"), filters=["name=file[13]*"])
+    asyncio.run(analyzer.analyze())
+
+    assert analyzer.stats['total_records'] == 2
+    assert analyzer.stats['filtered_records'] == 2
+    assert [recordnum for recordnum in reads if recordnum < 5] == [1, 2, 3, 4]
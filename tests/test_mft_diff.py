@@ -0,0 +1,66 @@
+import pytest
+import csv
+import struct
+from src.analyzeMFT.mft_diff import MftDiff
+from src.analyzeMFT.constants import *
+from .conftest import make_record, make_file_name
+
+def snapshot(records):
+    return b''.join(make_record(n, [make_file_name(parent, name)], seq, *flags, lsn=lsn)
+                    for n, (seq, lsn, parent, name, *flags) in enumerate(records))
+
+# (sequence, lsn, parent, name[, flags]) per record number; 5 is the root, 6 a directory
+OLD = [
+    (1, 10, 5, "a.txt"), (1, 10, 5, "b.txt"), (1, 10, 5, "c.txt"), (1, 10, 5, "d.txt"),
+    (1, 10, 5, "e.txt", 0), (1, 10, 5, "."), (1, 10, 5, "docs"), (1, 10, 6, "f.txt"),
+]
+NEW = [
+    (1, 10, 5, "a.txt"),                       # 0: unchanged
+    (1, 11, 5, "b.txt"),                       # 1: modified
+    (1, 10, 5, "c.txt", 0),                    # 2: deleted
+    (2, 12, 6, "new.txt"),                     # 3: reused for another file
+    (1, 12, 6, "e.txt"),                       # 4: created
+    (1, 10, 5, "."), (1, 10, 5, "docs"),
+    (1, 13, 6, "g.txt"),                       # 7: renamed
+    (1, 13, 6, "h.txt"),                       # 8: created past the end of the old snapshot
+]
+
+def test_diff_change_set(decoder, tmp_path):
+    (tmp_path / "old.mft").write_bytes(snapshot(OLD))
+    (tmp_path / "new.mft").write_bytes(snapshot(NEW))
+    output = tmp_path / "changes.csv"
+
+    diff = MftDiff(str(tmp_path / "old.mft"), str(tmp_path / "new.mft"), str(output))
+    diff.diff()
+
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == DIFF_HEADER
+    changes = [(row[0], int(row[1]), row[6], row[7]) for row in rows[1:]]
+    assert changes == [
+        ('modified', 1, "\\b.txt", "\\b.txt"),
+        ('deleted', 2, "\\c.txt", ""),
+        ('deleted', 3, "\\d.txt", ""),
+        ('created', 3, "", "\\docs\\new.txt"),
+        ('created', 4, "", "\\docs\\e.txt"),
+        ('renamed', 7, "\\docs\\f.txt", "\\docs\\g.txt"),
+        ('created', 8, "", "\\docs\\h.txt"),
+    ]
+    assert rows[1][4:6] == ['10', '11']
+    assert diff.stats['compared_records'] == 9
+    assert diff.stats['parsed_records'] == 9
+    assert (diff.stats['created'], diff.stats['deleted'], diff.stats['modified'], diff.stats['renamed']) == (3, 2, 1, 1)
+
+def test_diff_rejects_mismatched_record_sizes(tmp_path):
+    (tmp_path / "old.mft").write_bytes(snapshot(OLD))
+    other = bytearray(snapshot(NEW))
+    struct.pack_into("<I", other, 28, 4096)
+    (tmp_path / "new.mft").write_bytes(bytes(other))
+
+    with pytest.raises(ValueError):
+        MftDiff(str(tmp_path / "old.mft"), str(tmp_path / "new.mft"), str(tmp_path / "changes.csv")).diff()
+
+@pytest.mark.parametrize("record_size", [128, 1000, 131072])
+def test_diff_rejects_invalid_record_size(record_size):
+    with pytest.raises(ValueError):
+        MftDiff("old.mft", "new.mft", "changes.csv", record_size=record_size)
@@ -4,6 +4,8 @@ from unittest.mock import patch, MagicMock
 from src.analyzeMFT.mft_record import MftRecord
 from src.analyzeMFT.constants import *
 from src.analyzeMFT.windows_time import WindowsTime
+from src.analyzeMFT.parent_index import scan_file_name
+from .conftest import make_record, make_file_name
 import uuid
 
 @pytest.fixture
@@ -441,4 +443,94 @@ def test_parse_large_attribute():
     large_attr_record[24:] = large_attr_data
     
     record = MftRecord(large_attr_record)
-    assert DATA_ATTRIBUTE in record.attribute_types
\ No newline at end of file
+    assert DATA_ATTRIBUTE in record.attribute_types
+
+def test_tuple_round_trip(mft_record):
+    mft_record.filename = "test.txt"
+    mft_record.parent_ref = 5
+    mft_record.attribute_types = {STANDARD_INFORMATION_ATTRIBUTE, FILE_NAME_ATTRIBUTE}
+    mft_record.si_times['crtime'] = WindowsTime(0xd53e8000, 0x01d6b4a9)
+
+    values = mft_record.to_tuple()
+    restored = MftRecord.from_tuple(values)
+
+    assert len(values) == len(MftRecord.TUPLE_FIELDS)
+    assert restored.recordnum == mft_record.recordnum
+    assert restored.filename == "test.txt"
+    assert restored.get_parent_record_num() == 5
+    assert restored.attribute_types == mft_record.attribute_types
+    assert restored.si_times['crtime'].dtstr == mft_record.si_times['crtime'].dtstr
+    assert restored.to_csv() == mft_record.to_csv()
+
+def test_parsed_attributes_survive_init(mock_raw_record):
+    add_attribute(mock_raw_record, 56, EA_INFORMATION_ATTRIBUTE, struct.pack("<LL", 256, 2))
+    record = MftRecord(mock_raw_record)
+    assert record.ea_information == {'ea_size': 256, 'ea_count': 2}
+    assert record.data_attribute is None
+
+def test_parse_attribute_list_zero_length_entry(mft_record):
+    offset = 56
+    struct.pack_into("<LL", mft_record.raw_record, offset, ATTRIBUTE_LIST_ATTRIBUTE, 56)
+    struct.pack_into("<H", mft_record.raw_record, offset + 20, 24)
+    struct.pack_into("<LH", mft_record.raw_record, offset + 24, STANDARD_INFORMATION_ATTRIBUTE, 0)
+    mft_record.parse_attribute_list(offset)
+    assert mft_record.attribute_list == []
+
+def test_parse_record_from_memoryview(mock_raw_record):
+    add_attribute(mock_raw_record, 56, EA_INFORMATION_ATTRIBUTE, struct.pack("<LL", 256, 2))
+    record = MftRecord(memoryview(bytes(mock_raw_record)))
+    assert record.recordnum == 5
+    assert record.ea_information['ea_count'] == 2
+
+def test_record_has_no_instance_dict(mft_record):
+    assert not hasattr(mft_record, '__dict__')
+    with pytest.raises(AttributeError):
+        mft_record.not_a_field = 1
+
+def test_release_raw_record(mock_raw_record):
+    add_attribute(mock_raw_record, 56, EA_INFORMATION_ATTRIBUTE, struct.pack("<LL", 256, 2))
+    record = MftRecord(mock_raw_record, keep_raw=False)
+    assert record.raw_record == b''
+    assert record.ea_information['ea_size'] == 256
+    assert record.to_csv()[0] == 5
+
+def test_to_dict(mft_record):
+    mft_record.filename = "test.txt"
+    mft_record.attribute_types = {FILE_NAME_ATTRIBUTE, STANDARD_INFORMATION_ATTRIBUTE}
+    data = mft_record.to_dict()
+    assert list(data) == list(MftRecord.DICT_FIELDS)
+    assert data['filename'] == "test.txt"
+    assert data['attribute_types'] == [STANDARD_INFORMATION_ATTRIBUTE, FILE_NAME_ATTRIBUTE]
+    assert data['si_times']['crtime'] == "Not defined"
+    assert 'raw_record' not in data
+
+def test_selective_attribute_decoding(mock_raw_record):
+    fn_data = struct.pack("<QQQQQQQLLBB", 5, 131000000000000, 131000000000001, 131000000000002,
+                          131000000000003, 4096, 1024, 0, 0, 8, 1) + "test.txt".encode('utf-16le')
+    offset = add_attribute(mock_raw_record, 56, FILE_NAME_ATTRIBUTE, fn_data)
+    offset = add_attribute(mock_raw_record, offset, EA_INFORMATION_ATTRIBUTE, struct.pack("<LL", 256, 2))
+    struct.pack_into("<L", mock_raw_record, offset, 0xffffffff)
+
+    full = MftRecord(bytes(mock_raw_record))
+    record = MftRecord(bytes(mock_raw_record), attributes=TIMESTAMP_ATTRIBUTES)
+    assert record.filename == full.filename == "test.txt"
+    assert record.fn_times['mtime'].filetime == 131000000000001
+    assert full.ea_information['ea_count'] == 2
+    assert record.ea_information is None
+    assert record.attribute_types == full.attribute_types == {FILE_NAME_ATTRIBUTE, EA_INFORMATION_ATTRIBUTE}
+
+@pytest.mark.parametrize("names, expected", [
+    ([(1, "Program Files"), (2, "PROGRA~1")], "Program Files"),
+    ([(2, "PROGRA~1"), (1, "Program Files"), (0, "later")], "Program Files"),
+    ([(2, "PROGRA~1"), (2, "PROGRA~2")], "PROGRA~2"),
+])
+def test_filename_matches_parent_index_choice(names, expected):
+    raw = make_record(attributes=[make_file_name(5, name, namespace=namespace) for namespace, name in names])
+
+    record = MftRecord(raw)
+
+    assert record.filename == expected
+    assert scan_file_name(raw)[2] == expected
+
+def test_attribute_decoders_cover_named_types():
+    assert set(MftRecord.ATTRIBUTE_DECODERS) == set(ATTRIBUTE_NAMES)
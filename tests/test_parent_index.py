@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import MagicMock
+from src.analyzeMFT.parent_index import ParentIndex, scan_file_name, NO_PARENT
+from src.analyzeMFT.mft_analyzer import MftAnalyzer
+from src.analyzeMFT.constants import *
+from .conftest import make_record, make_file_name
+
+def make_named_record(seq, parent, parent_seq, names, flags=FILE_RECORD_IN_USE):
+    file_names = [make_file_name(parent, name, parent_seq, namespace) for namespace, name in names]
+    return make_record(attributes=file_names, seq=seq, flags=flags)
+
+@pytest.fixture
+def parent_index():
+    index = ParentIndex()
+    index.add(b'\x00' * MFT_RECORD_SIZE)                       # 0: not a FILE record
+    index.add(make_named_record(1, 5, 5, [(1, "Windows")]))           # 1
+    index.add(make_named_record(1, 1, 1, [(1, "System32")]))          # 2
+    index.add(make_named_record(3, 9, 1, [(1, "lost.txt")]))          # 3: parent outside the index
+    index.add(make_named_record(1, 6, 1, [(1, "stale.txt")]))         # 4: parent was reused
+    index.add(make_named_record(5, 5, 5, [(3, ".")]))                 # 5: root
+    index.add(make_named_record(4, 5, 5, [(1, "reused")]))            # 6
+    return index
+
+def test_scan_file_name_prefers_long_name():
+    raw = make_named_record(1, 5, 5, [(2, "PROGRA~1"), (1, "Program Files")])
+
+    assert scan_file_name(raw) == (5, 5, "Program Files")
+
+def test_scan_file_name_without_file_name():
+    raw = make_named_record(1, 5, 5, [])
+
+    assert scan_file_name(raw) is None
+
+def test_parent_index_columns(parent_index):
+    assert len(parent_index) == 7
+    assert 0 not in parent_index
+    assert parent_index.parent[0] == NO_PARENT
+    assert parent_index.name(2) == "System32"
+    assert parent_index.parent_of(2) == 1
+
+def test_parent_index_rejects_stale_parents(parent_index):
+    assert parent_index.parent_of(3) is None
+    assert parent_index.parent_of(4) is None
+
+def test_build_filepath_with_parent_index(parent_index):
+    analyzer = MftAnalyzer("test.mft", "output.csv", debug=False, compute_hashes=False, export_format="csv")
+    analyzer.parent_index = parent_index
+
+    assert analyzer.build_filepath(MagicMock(recordnum=2, filename="System32")) == "\\Windows\\System32"
+    assert analyzer.build_filepath(MagicMock(recordnum=3, filename="lost.txt")) == "UnknownParent_9\\lost.txt"
+    assert analyzer.build_filepath(MagicMock(recordnum=4, filename="stale.txt")) == "UnknownParent_6\\stale.txt"
+
+def test_build_filepath_reuses_cached_directories(parent_index):
+    analyzer = MftAnalyzer("test.mft", "output.csv", debug=False, compute_hashes=False, export_format="csv")
+    analyzer.parent_index = parent_index
+    parent_index.add(make_named_record(1, 2, 1, [(1, "a.dll")]))      # 7
+    parent_index.add(make_named_record(1, 2, 1, [(1, "b.dll")]))      # 8
+
+    assert analyzer.build_filepath(MagicMock(recordnum=7, filename="a.dll")) == "\\Windows\\System32\\a.dll"
+    misses = analyzer.path_cache.misses
+    assert analyzer.build_filepath(MagicMock(recordnum=8, filename="b.dll")) == "\\Windows\\System32\\b.dll"
+    assert analyzer.path_cache.misses == misses
+    assert analyzer.path_cache.hits == 1
+    assert (2, 1) in analyzer.path_cache
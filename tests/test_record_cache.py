@@ -0,0 +1,126 @@
+import pytest
+import asyncio
+from src.analyzeMFT.record_cache import RecordCache, RecordCacheWriter, input_key
+from src.analyzeMFT.mft_analyzer import MftAnalyzer
+from src.analyzeMFT.mft_record import MftRecord
+from src.analyzeMFT.windows_time import WindowsTime
+from src.analyzeMFT.constants import *
+from . import conftest
+
+KEY = {'input_size': 4096, 'input_sha256': 'ab' * 32}
+
+def make_record(recordnum, name, attributes=()):
+    record = MftRecord(b'\x00' * MFT_RECORD_SIZE)
+    record.recordnum = recordnum
+    record.magic = int.from_bytes(MFT_RECORD_MAGIC, BYTE_ORDER)
+    record.flags = FILE_RECORD_IN_USE
+    record.filename = name
+    record.filepath = f"\\dir\\{name}"
+    record.lsn = 2**63 + recordnum
+    record.attribute_types = {STANDARD_INFORMATION_ATTRIBUTE, FILE_NAME_ATTRIBUTE, *attributes}
+    record.si_times = {key: WindowsTime.from_filetime(133000000000000000 + recordnum * 10000 + i)
+                       for i, key in enumerate(MftRecord.TIME_KEYS)}
+    record.fn_times['mtime'] = WindowsTime.from_filetime(2**64 - 1)
+    return record
+
+def write_cache(path, blocks, key=KEY):
+    writer = RecordCacheWriter(str(path), key)
+    writer.open()
+    for block in blocks:
+        writer.write_block(block)
+    writer.close()
+
+def test_cache_round_trip(tmp_path):
+    records = [make_record(n, f"file{n}.txt") for n in range(5)]
+    records[1].filename = "café ☃.txt"
+    records[2].volume_name = ""
+    records[3].md5 = "d41d8cd98f00b204e9800998ecf8427e"
+    records[3].bitmap = {'size': 2, 'data': b'\xff\x01'}
+    records[4].attribute_types.add(0x1234)  # not a standard type code
+    path = tmp_path / "records.cache"
+    write_cache(path, [records[:3], [], records[3:]])
+
+    cache = RecordCache.load(str(path), KEY)
+    try:
+        blocks = list(cache.iter_blocks())
+        assert len(cache) == 5
+    finally:
+        cache.close()
+
+    assert [len(block) for block in blocks] == [3, 2]
+    loaded = [record for block in blocks for record in block]
+    for original, record in zip(records, loaded):
+        assert record.to_tuple() == original.to_tuple()
+        assert record.filepath == original.filepath
+        assert record.to_csv() == original.to_csv()
+
+def test_cache_rejects_other_input(tmp_path):
+    path = tmp_path / "records.cache"
+    write_cache(path, [[make_record(0, "a.txt")]])
+
+    assert RecordCache.load(str(path), dict(KEY, input_size=8192)) is None
+    assert RecordCache.load(str(tmp_path / "missing.cache"), KEY) is None
+    path.write_bytes(path.read_bytes()[:-1])
+    assert RecordCache.load(str(path), KEY) is None
+
+def test_discarded_cache_leaves_no_file(tmp_path):
+    path = tmp_path / "records.cache"
+    writer = RecordCacheWriter(str(path), KEY)
+    writer.open()
+    writer.write_block([make_record(0, "a.txt")])
+    writer.discard()
+    assert list(tmp_path.iterdir()) == []
+
+def test_input_key(tmp_path):
+    path = tmp_path / "test.mft"
+    path.write_bytes(b'FILE' * 1000)
+    with open(path, 'rb') as f:
+        f.read(10)
+        size, digest = input_key(f)
+        assert f.tell() == 0
+    assert size == 4000
+    assert len(digest) == 64
+
+def test_analyzer_reuses_cache(tmp_path):
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(conftest.make_record(i, flags=FILE_RECORD_IN_USE if i % 2 else 0) for i in range(10)))
+    cache_path = tmp_path / "records.cache"
+
+    first = MftAnalyzer(str(mft_path), str(tmp_path / "first.csv"), block_size=4, cache_file=str(cache_path))
+    asyncio.run(first.analyze())
+    assert cache_path.exists()
+
+    second = MftAnalyzer(str(mft_path), str(tmp_path / "second.csv"), block_size=4, cache_file=str(cache_path))
+    asyncio.run(second.analyze())
+
+    assert second.read_mode == "cache"
+    assert (tmp_path / "second.csv").read_bytes() == (tmp_path / "first.csv").read_bytes()
+    assert second.stats['total_records'] == 10
+    assert second.stats['active_records'] == first.stats['active_records'] == 5
+
+def test_cached_run_matches_fresh_run_with_collapsed_records(tmp_path):
+    # Zeroed records and a repeated record number collapse within a block; the replay has to
+    # report the input's counts and write the same rows as the run that built the cache.
+    records = [conftest.make_record(i, flags=FILE_RECORD_IN_USE if i % 3 else 0) for i in range(12)]
+    records[2] = records[9] = bytearray(MFT_RECORD_SIZE)
+    records[6] = conftest.make_record(5, flags=FILE_RECORD_IN_USE | FILE_RECORD_IS_DIRECTORY)
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(records))
+    cache_path = tmp_path / "records.cache"
+
+    runs = []
+    for name in ("fresh", "cached"):
+        analyzer = MftAnalyzer(str(mft_path), str(tmp_path / f"{name}.csv"), compute_hashes=True,
+                               block_size=4, cache_file=str(cache_path))
+        asyncio.run(analyzer.analyze())
+        runs.append(analyzer)
+    fresh, cached = runs
+
+    assert cached.read_mode == "cache"
+    assert (tmp_path / "cached.csv").read_bytes() == (tmp_path / "fresh.csv").read_bytes()
+    assert {name: cached.stats[name] for name in RECORD_CACHE_STATS} == \
+        {name: fresh.stats[name] for name in RECORD_CACHE_STATS}
+    assert cached.stats['total_records'] == 12
+    assert cached.stats['directories'] == 1
+    for name in fresh.hash_algorithms:
+        assert cached.stats[f'unique_{name}'] == fresh.stats[f'unique_{name}']
@@ -0,0 +1,72 @@
+import pytest
+import asyncio
+import csv
+from datetime import datetime, timezone
+from src.analyzeMFT.record_filter import RecordFilter, parse_time
+from src.analyzeMFT.record_headers import decode_headers
+from src.analyzeMFT.mft_analyzer import MftAnalyzer
+from src.analyzeMFT.constants import *
+from .conftest import make_record, make_standard_information, make_file_name
+
+NOW = datetime(2024, 3, 1, tzinfo=timezone.utc).timestamp()
+
+def filetime(text):
+    return parse_time(text, NOW)
+
+def make_timed_record(recordnum, name, flags=FILE_RECORD_IN_USE, si_mtime="2024-02-20", fn_crtime="2023-06-01"):
+    mtime = filetime(si_mtime)
+    return make_record(recordnum, [make_standard_information(filetime("2023-01-01"), mtime, mtime, mtime),
+                                   make_file_name(5, name, crtime=filetime(fn_crtime))], flags=flags)
+
+RECORDS = [
+    make_timed_record(0, "report.docx"),
+    make_timed_record(1, "setup.EXE", si_mtime="2023-12-01"),
+    make_timed_record(2, "old.txt", flags=0),
+    make_timed_record(3, "docs", flags=FILE_RECORD_IN_USE | FILE_RECORD_IS_DIRECTORY),
+    make_timed_record(4, "tool.dll", fn_crtime="2024-02-25"),
+    b'\x00' * MFT_RECORD_SIZE,
+]
+
+def matching(expressions):
+    record_filter = RecordFilter(expressions, NOW)
+    return [i for i, raw in enumerate(RECORDS) if record_filter.matches(raw)]
+
+def test_filter_stages():
+    assert matching(["in-use"]) == [0, 1, 3, 4]
+    assert matching(["deleted"]) == [2]
+    assert matching(["dir"]) == [3]
+    assert matching(["name=*o*", "file"]) == [0, 2, 4]
+    assert matching(["ext=exe,.dll"]) == [1, 4]
+    assert matching(["si-mtime>30d"]) == [0, 2, 3, 4]
+    assert matching(["in-use", "file", "si-mtime>=2024-02-01"]) == [0, 4]
+    assert matching(["fn-crtime<2024-01-01", "si-mtime<=2024-01-01T00:00:00"]) == [1]
+
+@pytest.mark.parametrize("expression", ["in use", "name", "ext=", "si-mtime>yesterday", "sx-mtime>1d", "fn-btime<1d"])
+def test_invalid_filters(expression):
+    with pytest.raises(ValueError):
+        RecordFilter([expression])
+
+def test_contradictory_filters():
+    with pytest.raises(ValueError):
+        RecordFilter(["dir", "file"])
+    RecordFilter(["dir", "in-use", "dir"])
+
+def test_header_mask(decoder):
+    headers = decode_headers(b''.join(RECORDS), MFT_RECORD_SIZE)
+    assert list(RecordFilter(["in-use", "file"]).header_mask(headers)) == [True, True, False, False, True, False]
+    assert list(RecordFilter(["ext=txt"]).header_mask(headers)) == [True] * 5 + [False]
+
+def test_analyzer_outputs_only_matching_records(decoder, tmp_path):
+    mft_path = tmp_path / "test.mft"
+    mft_path.write_bytes(b''.join(RECORDS))
+    output = tmp_path / "output.csv"
+
+    analyzer = MftAnalyzer(str(mft_path), str(output), filters=["in-use", "file", "si-mtime>=2024-02-01"])
+    asyncio.run(analyzer.analyze())
+
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert [row[7] for row in rows[1:]] == ["report.docx", "tool.dll"]
+    assert analyzer.stats['total_records'] == 2
+    assert analyzer.stats['filtered_records'] == 4
+    assert analyzer.stats['active_records'] == 2
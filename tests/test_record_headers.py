@@ -0,0 +1,31 @@
+import pytest
+from src.analyzeMFT.record_headers import decode_headers, count_flags, HEADER_COLUMNS
+from src.analyzeMFT.mft_record import MftRecord
+from src.analyzeMFT.constants import *
+from .conftest import make_record
+
+def make_header(recordnum, seq, flags, record_size=MFT_RECORD_SIZE):
+    # The hard link count must not leak into attr_off.
+    return make_record(recordnum, seq=seq, flags=flags, link=7, used_size=416, base_ref=(2 << 48) | 30,
+                       record_size=record_size)
+
+FLAGS = [FILE_RECORD_IN_USE, FILE_RECORD_IN_USE | FILE_RECORD_IS_DIRECTORY, 0, FILE_RECORD_IS_DIRECTORY]
+
+@pytest.mark.parametrize("record_size", [1024, 4096])
+def test_decode_headers_matches_mft_record(decoder, record_size):
+    raws = [make_header(n, n + 1, flags, record_size) for n, flags in enumerate(FLAGS)]
+    block = memoryview(b''.join(raws) + b'FILE')  # trailing partial record is ignored
+
+    columns = decode_headers(block, record_size)
+
+    assert set(columns) == {name for name, _, _ in HEADER_COLUMNS}
+    for i, raw in enumerate(raws):
+        record = MftRecord(raw)
+        for name in columns:
+            assert int(columns[name][i]) == getattr(record, name)
+    assert len(columns['flags']) == len(raws)
+
+def test_count_flags(decoder):
+    block = b''.join(make_header(n, 1, flags) for n, flags in enumerate(FLAGS))
+    assert count_flags(decode_headers(block, MFT_RECORD_SIZE)['flags']) == (2, 2)
+    assert count_flags(decode_headers(b'', MFT_RECORD_SIZE)['flags']) == (0, 0)
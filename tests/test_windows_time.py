@@ -1,5 +1,6 @@
 import pytest
-from src.analyzeMFT.windows_time import WindowsTime
+from src.analyzeMFT.windows_time import (WindowsTime, NOT_DEFINED, MAX_FILETIME, format_filetimes_numpy,
+                                         format_filetimes_python, prime_times)
 from datetime import datetime, timezone
 
 def test_windows_time_initialization():
@@ -42,4 +43,59 @@ def test_windows_time_dst_transition():
     wt = WindowsTime(0, 131242608000000000)  # March 13, 2016, 2:00 AM (just after DST starts in the US)
     assert wt.dt.hour == 2
     assert wt.dt.minute == 0
-    assert wt.dt.tzinfo == timezone.utc  # Ensure the time is in UTC
\ No newline at end of file
+    assert wt.dt.tzinfo == timezone.utc  # Ensure the time is in UTC
+
+def test_windows_time_keeps_raw_filetime():
+    wt = WindowsTime(0xd53e8000, 0x01d6b4a9)
+    assert wt.filetime == 0x01d6b4a9d53e8000
+    assert wt.low == 0xd53e8000
+    assert wt.high == 0x01d6b4a9
+    assert WindowsTime.from_filetime(wt.filetime) == wt
+
+def test_windows_time_exact_milliseconds():
+    # 2020-01-01 00:00:00.999 UTC plus 9999 ticks, truncated rather than rounded
+    wt = WindowsTime.from_filetime(132223104000000000 + 9999999)
+    assert wt.dtstr == "2020-01-01T00:00:00.999Z"
+    assert wt.unixtime == pytest.approx(1577836800.9999999)
+
+def test_windows_time_not_defined_is_shared():
+    wt = WindowsTime.from_filetime(0)
+    assert wt is NOT_DEFINED
+    assert wt.dtstr == "Not defined"
+    assert wt.dt is None
+    assert wt.unixtime == 0
+    assert wt == WindowsTime(0, 0)
+
+def test_windows_time_not_defined_is_immutable():
+    for name in ('filetime', '_unixtime', '_dt', '_dtstr'):
+        with pytest.raises(AttributeError):
+            setattr(NOT_DEFINED, name, 1)
+        with pytest.raises(AttributeError):
+            delattr(NOT_DEFINED, name)
+    assert NOT_DEFINED.filetime == 0
+    assert NOT_DEFINED.dtstr == "Not defined"
+
+def test_windows_time_out_of_range():
+    wt = WindowsTime.from_filetime(MAX_FILETIME + 1)
+    assert wt.dt is None
+    assert wt.dtstr == "Invalid timestamp"
+    assert wt.unixtime == 0
+
+BATCH_FILETIMES = [0, 1, 132223104000000000, 132223104009999999, 132223104010000000,
+                   MAX_FILETIME, MAX_FILETIME + 1, 2**64 - 1]
+
+def test_format_filetimes_python_matches_dtstr():
+    expected = [WindowsTime.from_filetime(ft).dtstr for ft in BATCH_FILETIMES]
+    assert format_filetimes_python(BATCH_FILETIMES) == expected
+
+def test_format_filetimes_numpy_matches_dtstr():
+    pytest.importorskip("numpy")
+    expected = [WindowsTime.from_filetime(ft).dtstr for ft in BATCH_FILETIMES]
+    assert format_filetimes_numpy(BATCH_FILETIMES) == expected
+
+def test_prime_times_fills_cache():
+    times = [WindowsTime.from_filetime(ft) for ft in BATCH_FILETIMES] + [WindowsTime(-1, -1)]
+    prime_times(times)
+    assert times[2]._dtstr == "2020-01-01T00:00:00.000Z"
+    assert times[3]._dtstr == "2020-01-01T00:00:00.999Z"
+    assert times[-1].dtstr == "Invalid timestamp"